@@ -0,0 +1,3 @@
+"""
+Offline benchmarks for the letter pipeline; see bench/run.py.
+"""
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+import zipfile
+import zlib
+
+from google.api_core.exceptions import ResourceExhausted
+
+from clai.gemini import estimate_tokens
+from clai.metrics import metrics
+
+# Characters per streamed chunk, roughly what Gemini sends
+STREAM_CHUNK_CHARS = 60
+
+# Companies and positions the fake model "extracts"; picked from a hash of the prompt so
+# the same posting always gets the same answer
+FAKE_COMPANIES = ["Northwind Robotics", "Lumen Analytics", "Harborline Systems", "Juniper Freight", "Orchard Labs"]
+FAKE_POSITIONS = ["Software Engineering Intern", "Backend Software Engineer", "Software Developer Intern"]
+
+
+def fake_fields(prompt):
+    """
+    Every field any of the prompts asks for, so one answer parses in both generation modes.
+    """
+    n = zlib.crc32(prompt.encode("utf-8"))
+    company_name = FAKE_COMPANIES[n % len(FAKE_COMPANIES)]
+    return {
+        "company_name": company_name,
+        "position_name": FAKE_POSITIONS[n % len(FAKE_POSITIONS)],
+        "requirements": "Python, Go, SQL, Docker, distributed systems",
+        "responseTop": f"I am eager to leverage my experience with Python, SQL and distributed systems to help "
+                       f"{company_name} ship reliable software from my first week.",
+        "glazing": f"I am drawn by {company_name}'s focus on dependable products that people rely on every day. "
+                   "Building software that has to keep working under pressure is exactly the kind of "
+                   "responsibility I want to grow into.",
+    }
+
+
+class FakeGeminiClient:
+    """
+    Offline stand-in for clai.gemini.GeminiClient. Each call sleeps for `latency` seconds
+    plus up to `jitter` more, then fails with ResourceExhausted with probability
+    `quota_error_rate` or streams fake_fields() as JSON.
+    """
+
+    def __init__(self, api_key, model_name=None, max_concurrency=8, latency=0.8, jitter=0.4, quota_error_rate=0.0):
+        self.api_key = api_key
+        self.model_name = model_name
+        self.max_concurrency = max_concurrency
+        self.latency = latency
+        self.jitter = jitter
+        self.quota_error_rate = quota_error_rate
+        self._semaphore = None
+
+    async def generate_stream(self, prompt, parser, generation_config=None):
+        # fake_fields() limited to the keys the parser expects, sent in chunks spread over
+        # the call's latency
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            fields = fake_fields(prompt)
+            if parser.properties:
+                fields = {key: value for key, value in fields.items() if key in parser.properties}
+            text = json.dumps(fields)
+            chunks = [text[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(text), STREAM_CHUNK_CHARS)]
+            delay = (self.latency + random.uniform(0, self.jitter)) / len(chunks)
+            if random.random() < self.quota_error_rate:
+                await asyncio.sleep(delay)
+                raise ResourceExhausted("Fake quota exceeded")
+            for chunk in chunks:
+                await asyncio.sleep(delay)
+                if parser.feed(chunk):
+                    break
+            text = parser.text()
+            return text, (estimate_tokens(prompt), estimate_tokens(text))
+
+
+def fake_gemini_factory(latency, jitter, quota_error_rate):
+    """
+    client_factory for configure_gemini() that builds FakeGeminiClients.
+    """
+    def factory(api_key, model_name, max_concurrency=8, rpm=None, tpm=None):
+        # The fake answers after its own latency, so the per-minute limits are not applied
+        return FakeGeminiClient(api_key, model_name, max_concurrency, latency, jitter, quota_error_rate)
+    return factory
+
+
+class StubConverter:
+    """
+    Stand-in for clai.converter.PdfConverter: waits `seconds` per document (at most
+    `instances` at a time, like resident LibreOffice workers) and writes a placeholder PDF.
+    """
+
+    def __init__(self, seconds=0.3, instances=1):
+        self.seconds = seconds
+        self._slots = threading.Semaphore(instances)
+
+    def convert_bytes(self, docx_bytes, name, output_dir):
+        with metrics.timer("convert"):
+            with self._slots:
+                time.sleep(self.seconds)
+            pdf_path = os.path.join(output_dir, f"{name}.pdf")
+            with open(pdf_path, "wb") as f:
+                f.write(b"%PDF-1.4\n% clai benchmark placeholder\n")
+            return pdf_path
+
+    def close(self):
+        pass
+
+
+# Smallest package python-docx and docxtpl accept, with the placeholders Template.docx uses
+TEMPLATE_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/word/document.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="word/document.xml"/>'
+        '</Relationships>'
+    ),
+    "word/document.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+        '<w:p><w:r><w:t>{{ today_date }}</w:t></w:r></w:p>'
+        '<w:p><w:r><w:t xml:space="preserve">Dear {{ company_name }} Hiring Team,</w:t></w:r></w:p>'
+        '<w:p><w:r><w:t xml:space="preserve">I am excited to apply for {{ a }} {{ position_name }} role at '
+        '{{ company_name }}. {{ generate }}</w:t></w:r></w:p>'
+        '<w:p><w:r><w:t>{{ glazing }}</w:t></w:r></w:p>'
+        '<w:p><w:r><w:t xml:space="preserve">I would love to contribute to {{ company_name_plural }} team.'
+        '</w:t></w:r></w:p>'
+        '</w:body></w:document>'
+    ),
+}
+
+
+def write_template(path):
+    """
+    Write a minimal letter template to `path`, so the benchmark does not depend on the
+    user's own Template.docx.
+    """
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, xml in TEMPLATE_PARTS.items():
+            archive.writestr(name, xml)
+    return path
@@ -0,0 +1,156 @@
+"""
+Offline benchmark for the batch pipeline. Job postings come from a local fixture
+server, Gemini is replaced by FakeGeminiClient and LibreOffice by StubConverter, so a
+run needs no network, API key or office suite. Usage (from the repository root):
+
+    python -m bench.run --sizes 1,100,1000
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Caches go to a throwaway directory so runs never read the user's cache or each other's;
+# clai reads these when it is first imported, so set them before the imports below
+WORK_DIR = tempfile.mkdtemp(prefix="clai-bench-")
+os.environ["CLAI_CACHE_DIR"] = os.path.join(WORK_DIR, "cache")
+os.environ["CLAI_LLM_CACHE"] = "off"
+
+from bench.fakes import StubConverter, fake_gemini_factory, write_template
+from bench.server import FixtureServer
+from bench.startup import DEFAULT_BUDGET_MS, check as check_startup, print_startup_report
+from clai import key_pool
+from clai.engine import GENERATION_MODES, STAGE_WORKERS, LetterPipeline
+from clai.gemini import configure_gemini
+from clai.metrics import metrics, summarize
+from clai.renderer import get_renderer
+
+DEFAULT_SIZES = "1,100,1000"
+
+
+def run_batch(server, first, size, pipeline):
+    """
+    Push `size` distinct fixture URLs through `pipeline` and return the batch result:
+    wall time, throughput, end-to-end latency per letter, stage and span summaries.
+    """
+    metrics.drain()  # Only count this batch
+    latencies = []
+    failures = []
+
+    def jobs():
+        for n in range(first, first + size):
+            yield {"url": server.url(n), "submitted": time.perf_counter()}
+
+    def on_done(job):
+        latencies.append(time.perf_counter() - job["submitted"])
+
+    def on_error(job, stage_name, e):
+        failures.append({"url": job["url"], "stage": stage_name, "error": str(e)})
+
+    start = time.perf_counter()
+    stages_summary = pipeline.run(jobs(), on_done=on_done, on_error=on_error)
+    wall_seconds = time.perf_counter() - start
+
+    report = metrics.report()
+    return {
+        "size": size,
+        "completed": len(latencies),
+        "failed": len(failures),
+        "wall_seconds": round(wall_seconds, 3),
+        "letters_per_minute": round(len(latencies) / wall_seconds * 60, 2) if wall_seconds else 0.0,
+        "latency": summarize(latencies),
+        "stages": stages_summary,
+        "spans": report["spans"],
+        "gemini": report["gemini"],
+        "failures": failures[:20],
+    }
+
+
+def print_results(results):
+    print(f"\n{'urls':>6}{'done':>7}{'failed':>8}{'wall s':>9}{'per min':>10}{'p50 s':>8}{'p95 s':>8}{'p99 s':>8}")
+    for r in results:
+        latency = r["latency"]
+        print(f"{r['size']:>6}{r['completed']:>7}{r['failed']:>8}{r['wall_seconds']:>9.2f}"
+              f"{r['letters_per_minute']:>10.2f}{latency['p50_seconds']:>8.2f}{latency['p95_seconds']:>8.2f}"
+              f"{latency['p99_seconds']:>8.2f}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the letter pipeline offline")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help=f"Comma-separated batch sizes to run (default: {DEFAULT_SIZES})")
+    parser.add_argument("--mode", choices=GENERATION_MODES, default="single",
+                        help="Generation mode, as in multigen.py (default: single)")
+    parser.add_argument("--keys", type=int, default=4,
+                        help="Fake Gemini API keys (default: 4)")
+    parser.add_argument("--max-inflight", type=int, default=8,
+                        help="Requests kept in flight per fake key (default: 8)")
+    parser.add_argument("--gemini-latency", type=float, default=0.8,
+                        help="Seconds every fake Gemini call takes (default: 0.8)")
+    parser.add_argument("--gemini-jitter", type=float, default=0.4,
+                        help="Extra random seconds added to each fake Gemini call (default: 0.4)")
+    parser.add_argument("--quota-error-rate", type=float, default=0.0,
+                        help="Fraction of fake Gemini calls that fail with ResourceExhausted (default: 0)")
+    parser.add_argument("--cooldown", type=float, default=2.0,
+                        help="Seconds a fake key rests after a quota error (default: 2)")
+    parser.add_argument("--convert-seconds", type=float, default=0.3,
+                        help="Seconds the stub converter spends per document (default: 0.3)")
+    parser.add_argument("--converters", type=int, default=1,
+                        help="Documents the stub converter handles at once (default: 1)")
+    parser.add_argument("--server-latency", type=float, default=0.05,
+                        help="Seconds the fixture server waits before answering (default: 0.05)")
+    parser.add_argument("--output", default=os.path.join("bench", "results.json"),
+                        help="Where to write the JSON results (default: bench/results.json)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    try:
+        sizes = [int(size) for size in args.sizes.split(",")]
+    except ValueError:
+        print(f"Error: --sizes must be comma-separated integers, got '{args.sizes}'")
+        sys.exit(1)
+
+    # Stand-ins for the external dependencies; Gemini is faked per key so the key pool still runs
+    configure_gemini([f"fake-key-{n + 1}" for n in range(args.keys)], max_concurrency=args.max_inflight,
+                     client_factory=fake_gemini_factory(args.gemini_latency, args.gemini_jitter,
+                                                        args.quota_error_rate))
+    key_pool.COOLDOWN_SECONDS = args.cooldown
+
+    output_dir = os.path.join(WORK_DIR, "letters")
+    os.makedirs(output_dir)
+    template_path = write_template(os.path.join(WORK_DIR, "Template.docx"))
+    get_renderer(template_path)  # Compile once up front, as the real scripts do
+
+    server = FixtureServer(latency=args.server_latency).start()
+    pipeline = LetterPipeline(template_path, output_dir, args.mode, workers=STAGE_WORKERS,
+                              converter=StubConverter(args.convert_seconds, args.converters),
+                              copy_to_clipboard=False)  # No clipboard on a headless benchmark machine
+
+    results = []
+    first = 0
+    try:
+        for size in sizes:
+            print(f"Running a batch of {size} URL(s)...")
+            results.append(run_batch(server, first, size, pipeline))
+            first += size  # New URLs every batch so nothing is served from the scrape cache
+    finally:
+        server.stop()
+
+    print_results(results)
+    startup, _ = check_startup(DEFAULT_BUDGET_MS)
+    print_startup_report(startup, DEFAULT_BUDGET_MS)
+
+    settings = {key: value for key, value in vars(args).items() if key != "output"}
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"settings": settings, "batches": results, "startup": startup}, f, indent=2)
+        f.write("\n")
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import glob
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixtures(directory=FIXTURES_DIR):
+    """
+    Read every recorded posting in `directory`, sorted by file name, as bytes.
+    """
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.html"))):
+        with open(path, "rb") as f:
+            fixtures.append((os.path.splitext(os.path.basename(path))[0], f.read()))
+    if not fixtures:
+        raise RuntimeError(f"No HTML fixtures found in {directory}")
+    return fixtures
+
+
+class FixtureServer:
+    """
+    Local HTTP server that stands in for the job boards. `/jobs/<n>` serves fixture
+    n modulo the number of fixtures, so any number of distinct URLs can be generated
+    from a handful of recordings. `latency` seconds are added before every response.
+    """
+
+    def __init__(self, latency=0.0, directory=FIXTURES_DIR):
+        self.latency = latency
+        self.fixtures = load_fixtures(directory)
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parts = self.path.strip("/").split("/")
+                if len(parts) != 2 or parts[0] != "jobs" or not parts[1].isdigit():
+                    self.send_error(404)
+                    return
+                with server._lock:
+                    server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+
+                _, body = server.fixtures[int(parts[1]) % len(server.fixtures)]
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep the benchmark output readable
+
+        return Handler
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, n):
+        return f"{self.base_url}/jobs/{n}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fixture-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
@@ -0,0 +1,111 @@
+"""
+Startup budget check for the entry points. Each script is imported in a fresh
+interpreter under `python -X importtime`; the check fails if an import takes longer
+than the budget or loads one of the heavy dependencies (clai.engine.HEAVY_MODULES)
+before it is needed. Usage (from the repository root):
+
+    python -m bench.startup --budget-ms 300
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+from clai.engine import HEAVY_MODULES
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRY_POINTS = ("main", "multigen", "serve")
+
+DEFAULT_BUDGET_MS = 300
+
+# "import time: self [us] | cumulative | imported package", indented by nesting depth
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$")
+
+# Slowest imports listed per entry point
+TOP_IMPORTS = 8
+
+
+def parse_importtime(stderr):
+    """
+    (module, self_us, cumulative_us, depth) for every line of an -X importtime report.
+    """
+    entries = []
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return entries
+
+
+def measure(module, runs=3):
+    """
+    Import `module` in `runs` fresh interpreters and return its fastest import time,
+    the slowest modules it pulls in and any heavy dependency loaded along the way.
+    """
+    code = f"import {module}, json, sys; print(json.dumps(sorted(sys.modules)))"
+    best = None
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=REPO_DIR,
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+        entries = parse_importtime(result.stderr)
+        total_us = next((cumulative for name, _, cumulative, depth in entries
+                         if name == module and depth == 0), 0)
+        if best is None or total_us < best[0]:
+            best = (total_us, entries, json.loads(result.stdout.strip().splitlines()[-1]))
+
+    total_us, entries, loaded = best
+    slowest = sorted(entries, key=lambda entry: -entry[1])[:TOP_IMPORTS]
+    return {
+        "module": module,
+        "import_ms": round(total_us / 1000, 1),
+        "heavy_modules": [name for name in HEAVY_MODULES if name in loaded],
+        "slowest": [{"module": name, "self_ms": round(self_us / 1000, 1)} for name, self_us, _, _ in slowest],
+    }
+
+
+def check(budget_ms=DEFAULT_BUDGET_MS, modules=ENTRY_POINTS, runs=3):
+    """
+    Measure every entry point and return (results, ok).
+    """
+    results = [measure(module, runs) for module in modules]
+    for r in results:
+        r["within_budget"] = r["import_ms"] <= budget_ms and not r["heavy_modules"]
+    return results, all(r["within_budget"] for r in results)
+
+
+def print_startup_report(results, budget_ms):
+    print(f"\nImport time (budget {budget_ms} ms):")
+    print(f"{'module':<12}{'ms':>8}  {'status':<8}slowest imports")
+    for r in results:
+        status = "ok" if r["within_budget"] else "OVER"
+        slowest = ", ".join(f"{s['module']} {s['self_ms']}" for s in r["slowest"][:3])
+        print(f"{r['module']:<12}{r['import_ms']:>8.1f}  {status:<8}{slowest}")
+        if r["heavy_modules"]:
+            print(f"{'':<22}loaded at import: {', '.join(r['heavy_modules'])}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Check how long the CLAI scripts take to import")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"Maximum import time per script in milliseconds (default: {DEFAULT_BUDGET_MS})")
+    parser.add_argument("--runs", type=int, default=3,
+                        help="Fresh interpreters per script; the fastest run counts (default: 3)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    results, ok = check(args.budget_ms, runs=args.runs)
+    print_startup_report(results, args.budget_ms)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
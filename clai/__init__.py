@@ -0,0 +1,8 @@
+"""
+Shared building blocks for the CLAI cover letter scripts (main.py and multigen.py).
+"""
+
+import os
+
+# Where the on-disk caches live; override with the CLAI_CACHE_DIR environment variable
+CACHE_DIR = os.environ.get("CLAI_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "clai"))
@@ -0,0 +1,200 @@
+import os
+import re
+
+# Token budget for the description sent to Gemini; override with CLAI_DESCRIPTION_TOKENS
+DEFAULT_TOKEN_BUDGET = int(os.environ.get("CLAI_DESCRIPTION_TOKENS", "1200"))
+
+# Lines that never help extraction or letter writing, checked in one pass per line
+BOILERPLATE_PATTERNS = re.compile("|".join([
+    # Equal opportunity and accommodation statements
+    r"equal (employment )?opportunit", r"without regard to", r"affirmative action", r"employment equity",
+    r"protected veteran", r"reasonable accommodation", r"accommodations? (are|is) available",
+    r"(race|religion|sexual orientation|gender identity|national origin)\b.*\b(disability|veteran|age)\b",
+    # Privacy, cookies and legal
+    r"privacy (policy|notice|statement)", r"we use cookies", r"cookie (policy|settings|preferences)",
+    r"terms (of use|of service|and conditions)", r"all rights reserved", r"^©|^&copy;|copyright \d{4}",
+    # Application forms and surveys
+    r"voluntary self-identification", r"omb control number", r"form cc-305", r"\bdemographic\b",
+    r"mark all that apply", r"describe your (gender|race|ethnicity|sexual)",
+    r"^(first|last) name\b", r"^(resume|cv|cover letter)(/cv)?\b", r"submit (your )?application",
+    r"^apply (now|for this job)", r"^(are you|do you|how did you|will you now or in the future)\b.*\?$",
+    # Navigation, sharing and site chrome
+    r"^(home|about us|products|contact( us)?|careers|blog|log ?in|sign (in|up)|menu|search|back to (all )?jobs)$",
+    r"^(share|follow us|subscribe)\b", r"powered by (lever|greenhouse|workday|ashby)", r"jobs powered by",
+    r"skip to (main )?content", r"^(show|see) (more|less)$", r"newsletter", r"home ?page$",
+]), re.IGNORECASE)
+
+# Lines made of four or more short menu entries separated by bullets or pipes
+NAV_LINE = re.compile(r"^(\S[^|·•]{0,25}\s*[|·•]\s*){3,}\S[^|·•]{0,25}$")
+
+# Typical menu entries; a short line with several of them is a navigation bar
+NAV_WORDS = re.compile(r"\b(home|products?|about|careers|contact|blog|jobs|pricing|login|solutions|"
+                       r"resources|company|support|news|team)\b", re.IGNORECASE)
+# How section headings usually start; other short lines are list items, not headings
+HEADING_START = re.compile(
+    r"^(about|requirements?|qualifications|minimum|basic|preferred|responsibilities|duties|what|who|why|how|"
+    r"your|the (role|team|job|position|opportunity)|our|benefits|perks|compensation|salary|pay|skills|"
+    r"nice to have|bonus|job (description|summary)|description|overview|summary|key|important items|location)\b",
+    re.IGNORECASE,
+)
+
+# Section headings and the relevance of the text under them
+SECTION_WEIGHTS = [
+    (re.compile(r"requirement|qualification|what you (bring|have|need)|looking for|who you are|skills|"
+                r"about you|you (have|might be|should)|must have|technical|experience|important items", re.I), 3.0),
+    (re.compile(r"responsibilit|what you('ll| will) (do|work on)|the role|your role|day to day|duties|"
+                r"opportunity|about the (job|position|role|team)", re.I), 2.0),
+    (re.compile(r"nice to have|bonus|preferred|plus", re.I), 1.5),
+    (re.compile(r"about|who we are|our (mission|values|company|story)|why (join|work)|culture", re.I), 1.2),
+    (re.compile(r"benefit|perk|compensation|salary|pay|wage|vacation|insurance|location|how to apply", re.I), 0.3),
+]
+
+# Smallest part of an oversized line worth keeping when the budget is nearly spent
+MIN_FRAGMENT_TOKENS = 16
+
+# Technologies and skills; their density raises a section's score
+SKILL_TERMS = re.compile(
+    r"\b(python|java|javascript|typescript|golang|rust|c\+\+|c#|\.net|kotlin|swift|ruby|php|scala|sql|"
+    r"nosql|postgres(?:ql)?|mysql|mongodb|redis|kafka|spark|hadoop|aws|azure|gcp|docker|kubernetes|terraform|"
+    r"linux|git|react|angular|vue|node(?:\.js)?|django|flask|spring|graphql|restful|grpc|apis?|"
+    r"machine learning|cloud|distributed|microservices|ci/cd|testing|embedded|security|algorithms)\b",
+    re.IGNORECASE,
+)
+
+
+def estimate_tokens(text):
+    """
+    Rough token count (about four characters per token for English text).
+    """
+    return max(1, len(text) // 4)
+
+
+def line_cost(line):
+    """
+    Tokens a line adds to the condensed text, counting its newline, so the costs of the
+    chosen lines add up to no less than estimate_tokens() of the result.
+    """
+    return (len(line) + 1) / 4
+
+
+def cut_to_tokens(line, tokens):
+    """
+    Cut `line` to about `tokens` tokens, at the last sentence end if one falls in the
+    second half of the allowance and otherwise at the last word boundary.
+    """
+    limit = tokens * 4
+    if len(line) <= limit:
+        return line
+    head = line[:limit]
+    sentence_end = max(head.rfind(". "), head.rfind("! "), head.rfind("? "))
+    if sentence_end >= limit // 2:
+        return head[:sentence_end + 1]
+    space = head.rfind(" ")
+    return head[:space] if space > 0 else head
+
+
+def is_heading(line):
+    """
+    Short lines ending in a colon, or short heading-like lines without sentence
+    punctuation, start a new section.
+    """
+    if line.endswith(":"):
+        return len(line) <= 80
+    return (len(line.split()) <= 6 and not line.endswith((".", ",", ";", "!", "?"))
+            and bool(HEADING_START.match(line)))
+
+
+def strip_boilerplate(text):
+    """
+    Drop boilerplate and navigation lines and repeated lines, keeping the order of the rest.
+    """
+    kept = []
+    seen = set()
+    for line in text.splitlines():
+        line = " ".join(line.split())
+        if not line or line.lower() in seen:
+            continue
+        if BOILERPLATE_PATTERNS.search(line) or NAV_LINE.match(line):
+            continue
+        if len(line.split()) <= 10 and len(NAV_WORDS.findall(line)) >= 3:
+            continue
+        seen.add(line.lower())
+        kept.append(line)
+    return kept
+
+
+def split_sections(lines):
+    """
+    Group lines into [heading, body lines] sections; text before the first heading forms
+    a section with an empty heading.
+    """
+    sections = [["", []]]
+    for line in lines:
+        if not is_heading(line):
+            sections[-1][1].append(line)
+        elif sections[-1][1]:
+            sections.append([line, []])
+        elif not sections[-1][0]:
+            sections[-1][0] = line
+        else:
+            sections[-1] = [line, []]  # Two headings in a row; keep the one closer to the text
+    return [s for s in sections if s[0] or s[1]]
+
+
+def score_section(heading, body, index):
+    """
+    Relevance of one section: its heading's weight, boosted by how many skills it names.
+    The opening section usually holds the title and company, so it is always favoured.
+    """
+    weight = 1.0
+    for pattern, section_weight in SECTION_WEIGHTS:
+        if pattern.search(heading):
+            weight = section_weight
+            break
+    text = " ".join(body)
+    skills = len(SKILL_TERMS.findall(text))
+    score = weight * (1.0 + min(skills, 20) / 5.0)
+    if index == 0:
+        score += 10.0
+    return score
+
+
+def condense(text, token_budget=None):
+    """
+    Shrink a scraped job description to the parts worth sending to Gemini: boilerplate is
+    stripped, sections are scored by relevance, and the best ones are packed into
+    `token_budget` tokens (DEFAULT_TOKEN_BUDGET) in their original order.
+    """
+    if not text:
+        return text
+    budget = token_budget or DEFAULT_TOKEN_BUDGET
+    sections = split_sections(strip_boilerplate(text))
+
+    ranked = sorted(range(len(sections)), key=lambda i: -score_section(sections[i][0], sections[i][1], i))
+    chosen = {}
+    remaining = budget
+    for i in ranked:
+        heading, body = sections[i]
+        # The heading is paid for up front; a section whose heading alone would use up the
+        # budget is skipped
+        room = remaining - (line_cost(heading) if heading else 0)
+        lines = []
+        for line in body:
+            cost = line_cost(line)
+            if cost > room:
+                # Keep the start of an oversized line (a whole description can be one
+                # paragraph) rather than dropping it
+                if room >= MIN_FRAGMENT_TOKENS:
+                    line = cut_to_tokens(line, int(room) - 1)
+                    lines.append(line)
+                    room -= line_cost(line)
+                break
+            lines.append(line)
+            room -= cost
+        if lines:
+            chosen[i] = [heading] + lines if heading else lines
+            remaining = room
+        if remaining <= 0:
+            break
+
+    return "\n".join(line for i in sorted(chosen) for line in chosen[i])
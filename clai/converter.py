@@ -0,0 +1,252 @@
+import atexit
+import os
+import queue
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+
+from clai.metrics import metrics
+
+# Used when neither LIBREOFFICE_BINARY nor PATH points at LibreOffice
+MACOS_SOFFICE = '/Applications/LibreOffice.app/Contents/MacOS/soffice'
+
+# Resident LibreOffice instances kept by the shared converter
+DEFAULT_INSTANCES = 1
+
+# Batch fallback: convert up to this many queued files per soffice launch
+BATCH_SIZE = 16
+
+_STOP = object()
+
+
+def find_soffice():
+    """
+    Locate the LibreOffice binary: the LIBREOFFICE_BINARY environment variable, then
+    soffice/libreoffice on PATH, then the default macOS install location.
+    """
+    configured = os.environ.get("LIBREOFFICE_BINARY")
+    if configured:
+        return configured
+    for name in ("soffice", "libreoffice"):
+        found = shutil.which(name)
+        if found:
+            return found
+    return MACOS_SOFFICE
+
+
+def _profile_arg(profile_dir):
+    # A private user profile lets several LibreOffice processes run side by side
+    return "-env:UserInstallation=file://" + os.path.abspath(profile_dir)
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def convert_many(input_files, output_dir, binary=None, profile_dir=None):
+    """
+    Convert several DOCX files to PDF with a single soffice invocation.
+    """
+    command = [binary or find_soffice(), '--headless']
+    if profile_dir:
+        command.append(_profile_arg(profile_dir))
+    command += ['--convert-to', 'pdf', '--outdir', output_dir] + list(input_files)
+    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise RuntimeError(f"LibreOffice exited with {result.returncode}: {result.stderr.decode(errors='replace').strip()}")
+
+
+class _UnoserverInstance:
+    """
+    One resident LibreOffice managed by unoserver (https://github.com/unoconv/unoserver),
+    driven over its XML-RPC port.
+    """
+
+    def __init__(self, binary, profile_dir):
+        self.port = _free_port()
+        self.uno_port = _free_port()
+        self.process = subprocess.Popen(
+            ["unoserver", "--interface", "127.0.0.1", "--port", str(self.port), "--uno-port", str(self.uno_port),
+             "--executable", binary, "--user-installation", "file://" + os.path.abspath(profile_dir)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        self._wait_until_listening()
+
+    def _wait_until_listening(self, timeout=60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError("unoserver exited during startup")
+            try:
+                socket.create_connection(("127.0.0.1", self.port), timeout=1).close()
+                return
+            except OSError:
+                time.sleep(0.25)
+        raise RuntimeError("unoserver did not start listening in time")
+
+    def convert(self, data, outpath):
+        # The DOCX bytes are streamed to unoconvert's stdin ("-")
+        subprocess.run(
+            ["unoconvert", "--host", "127.0.0.1", "--port", str(self.port), "--convert-to", "pdf", "-", outpath],
+            input=data, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True,
+        )
+        return outpath
+
+    def close(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+class PdfConverter:
+    """
+    Conversion service with a queue in front of `instances` LibreOffice workers.
+
+    With unoserver installed, every worker keeps one LibreOffice resident and converts
+    documents one by one without cold starts. Otherwise each worker drains the queue in
+    batches and converts up to BATCH_SIZE files per soffice launch, which spreads the
+    startup cost over the whole batch. Every worker has its own LibreOffice profile so
+    the workers never block each other.
+    """
+
+    def __init__(self, binary=None, instances=DEFAULT_INSTANCES, use_unoserver=None):
+        self.binary = binary or find_soffice()
+        if use_unoserver is None:
+            use_unoserver = shutil.which("unoserver") is not None and shutil.which("unoconvert") is not None
+        self.use_unoserver = use_unoserver
+        self._queue = queue.Queue()
+        self._profiles = tempfile.mkdtemp(prefix="clai-libreoffice-")
+        self._workers = []
+        for n in range(instances):
+            thread = threading.Thread(target=self._run, args=(n,), name=f"pdf-converter-{n + 1}", daemon=True)
+            thread.start()
+            self._workers.append(thread)
+
+    def submit_bytes(self, docx_bytes, name, output_dir):
+        """
+        Queue an in-memory DOCX for conversion to `<output_dir>/<name>.pdf`.
+        The returned Future resolves to the PDF path.
+        """
+        future = Future()
+        self._queue.put((name + ".docx", docx_bytes, os.path.join(output_dir, name + ".pdf"), future))
+        return future
+
+    def convert_bytes(self, docx_bytes, name, output_dir):
+        with metrics.timer("convert"):
+            return self.submit_bytes(docx_bytes, name, output_dir).result()
+
+    def _run(self, n):
+        profile_dir = os.path.join(self._profiles, f"worker-{n + 1}")
+        instance = None
+        if self.use_unoserver:
+            try:
+                instance = _UnoserverInstance(self.binary, profile_dir)
+            except (OSError, RuntimeError) as e:
+                print(f"Could not start unoserver, converting in batches instead: {e}")
+
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+                if instance is not None:
+                    self._convert_one(instance, item)
+                    continue
+
+                # Take whatever queued up while the previous batch was converting; a lone
+                # document is converted right away instead of waiting for company
+                batch = [item]
+                while len(batch) < BATCH_SIZE:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        self._queue.put(_STOP)  # Finish this batch first, then stop
+                        break
+                    batch.append(item)
+                self._convert_batch(batch, profile_dir)
+        finally:
+            if instance is not None:
+                instance.close()
+
+    def _convert_one(self, instance, item):
+        _, data, pdf_path, future = item
+        try:
+            future.set_result(instance.convert(data, pdf_path))
+        except Exception as e:
+            future.set_exception(e)
+
+    def _convert_batch(self, batch, profile_dir):
+        # soffice needs files on disk: spill the documents to a private scratch directory
+        scratch = tempfile.mkdtemp(dir=self._profiles, prefix="batch-")
+        try:
+            # Documents bound for different directories can share a name, so each output
+            # directory gets its own soffice run
+            by_dir = {}
+            for n, (file_name, data, pdf_path, future) in enumerate(batch):
+                os.makedirs(os.path.join(scratch, str(n)))
+                input_file = os.path.join(scratch, str(n), file_name)
+                with open(input_file, "wb") as f:
+                    f.write(data)
+                by_dir.setdefault(os.path.dirname(pdf_path), []).append((input_file, pdf_path, future))
+
+            # Convert into the scratch directory and move each PDF into place, so a PDF left
+            # over from an earlier run is never mistaken for this one and survives a failure
+            for n, items in enumerate(by_dir.values()):
+                converted_dir = os.path.join(scratch, f"pdf-{n}")
+                os.makedirs(converted_dir)
+                try:
+                    convert_many([input_file for input_file, _, _ in items], converted_dir, self.binary, profile_dir)
+                except Exception as e:
+                    for _, _, future in items:
+                        future.set_exception(e)
+                    continue
+                for input_file, pdf_path, future in items:
+                    converted = os.path.join(converted_dir, os.path.splitext(os.path.basename(input_file))[0] + ".pdf")
+                    if os.path.exists(converted):
+                        shutil.move(converted, pdf_path)
+                        future.set_result(pdf_path)
+                    else:
+                        future.set_exception(RuntimeError(f"LibreOffice did not produce {pdf_path}"))
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    def close(self):
+        for _ in self._workers:
+            self._queue.put(_STOP)
+        for thread in self._workers:
+            thread.join()
+        shutil.rmtree(self._profiles, ignore_errors=True)
+
+
+_shared_converter = None
+_shared_converter_lock = threading.Lock()
+
+
+def get_converter(instances=None):
+    """
+    Return the process-wide PdfConverter. The instance count passed on the first call
+    decides how many LibreOffice workers it runs.
+    """
+    global _shared_converter
+    with _shared_converter_lock:
+        if _shared_converter is None:
+            _shared_converter = PdfConverter(instances=instances or DEFAULT_INSTANCES)
+            atexit.register(_shared_converter.close)
+        return _shared_converter
+
+
+def convert_docx_bytes(docx_bytes, name, output_dir):
+    """
+    Convert an in-memory DOCX to `<output_dir>/<name>.pdf` through the shared converter.
+    """
+    return get_converter().convert_bytes(docx_bytes, name, output_dir)
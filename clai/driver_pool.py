@@ -0,0 +1,214 @@
+import atexit
+import queue
+import threading
+import time
+
+from clai.metrics import metrics
+
+# Selenium is imported where a browser is first needed, so runs that never open one
+# (cache hits, pages served by the HTTP tier, manual entry) don't pay for it
+
+# Defaults used when the shared pool is created without explicit settings
+DEFAULT_POOL_SIZE = 1
+DEFAULT_MAX_PAGES = 25
+
+
+def build_chrome_options():
+    """
+    Chrome flags shared by every pooled browser (same as the old per-attempt driver).
+    """
+    from selenium.webdriver.chrome.options import Options
+
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--incognito")
+    return chrome_options
+
+
+class DriverPool:
+    """
+    Keeps up to `size` headless Chrome instances warm between jobs.
+
+    Browsers are started lazily the first time they are needed (or all at once via
+    warm()), wiped of cookies and storage when handed back, and replaced after
+    `max_pages` jobs or as soon as they stop responding.
+    """
+
+    def __init__(self, size=DEFAULT_POOL_SIZE, max_pages=DEFAULT_MAX_PAGES):
+        if size < 1:
+            raise ValueError("DriverPool size must be at least 1")
+        self.size = size
+        self.max_pages = max_pages
+        self._idle = queue.LifoQueue()  # Most recently used browser first, it is the warmest
+        self._pages = {}  # id(driver) -> jobs served by that driver
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _start_driver(self):
+        from selenium import webdriver
+
+        with metrics.timer("browser.start"):
+            driver = webdriver.Chrome(options=build_chrome_options())
+        with self._lock:
+            self._pages[id(driver)] = 0
+        return driver
+
+    def warm(self):
+        """
+        Start every browser up front so the first jobs don't pay Chrome startup.
+        """
+        started = []
+        while True:
+            with self._lock:
+                if self._created >= self.size:
+                    break
+                self._created += 1
+            try:
+                started.append(self._start_driver())
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        for driver in started:
+            self._idle.put(driver)
+
+    def acquire(self, timeout=None):
+        """
+        Take a browser from the pool, starting a new one if the pool is not full yet.
+        Blocks until a browser is free otherwise.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self._closed:
+                raise RuntimeError("DriverPool is closed")
+
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+
+            with self._lock:
+                can_start = self._created < self.size
+                if can_start:
+                    self._created += 1
+            if can_start:
+                try:
+                    return self._start_driver()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+
+            # Wait briefly, then look again: a retired browser frees a slot without
+            # putting anything on the idle queue
+            wait = 0.5 if deadline is None else min(0.5, deadline - time.monotonic())
+            if wait <= 0:
+                raise queue.Empty
+            try:
+                return self._idle.get(timeout=wait)
+            except queue.Empty:
+                continue
+
+    def release(self, driver, discard=False):
+        """
+        Hand a browser back. It is reset and reused unless it crashed, reached
+        `max_pages`, or the caller asks for it to be discarded.
+        """
+        with self._lock:
+            pages = self._pages.get(id(driver), 0) + 1
+            self._pages[id(driver)] = pages
+
+        if discard or self._closed or pages >= self.max_pages:
+            self._retire(driver)
+            return
+
+        with metrics.timer("browser.reset"):
+            reset = self._reset(driver)
+        if not reset:
+            self._retire(driver)
+            return
+
+        self._idle.put(driver)
+
+    def _reset(self, driver):
+        """
+        Clear cookies, storage and cache so the next job starts as clean as a fresh
+        incognito window. Returns False if the browser did not respond.
+        """
+        from selenium.common.exceptions import WebDriverException
+
+        try:
+            current_url = driver.current_url
+            if current_url.startswith("http"):
+                origin = "/".join(current_url.split("/", 3)[:3])
+                driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+            driver.get("about:blank")
+            return True
+        except WebDriverException:
+            return False
+
+    def _retire(self, driver):
+        with self._lock:
+            self._pages.pop(id(driver), None)
+            self._created -= 1
+        try:
+            driver.quit()
+        except Exception:
+            pass  # The browser may already be gone if it crashed
+
+    def close(self):
+        """
+        Quit every idle browser. Browsers still checked out are quit when released.
+        """
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._retire(driver)
+
+    def driver(self):
+        """
+        Context manager version of acquire()/release(); a WebDriverException raised
+        inside the block discards the browser instead of returning it to the pool.
+        """
+        return _PooledDriver(self)
+
+
+class _PooledDriver:
+    def __init__(self, pool):
+        self.pool = pool
+        self.driver = None
+
+    def __enter__(self):
+        self.driver = self.pool.acquire()
+        return self.driver
+
+    def __exit__(self, exc_type, exc, tb):
+        from selenium.common.exceptions import WebDriverException
+
+        crashed = exc_type is not None and issubclass(exc_type, WebDriverException)
+        self.pool.release(self.driver, discard=crashed)
+        return False
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_driver_pool(size=None, max_pages=None):
+    """
+    Return the process-wide DriverPool used by main.py and multigen.py. The settings
+    passed on the first call decide the pool's size; later calls just return it.
+    """
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = DriverPool(size or DEFAULT_POOL_SIZE, max_pages or DEFAULT_MAX_PAGES)
+            atexit.register(_shared_pool.close)
+        return _shared_pool
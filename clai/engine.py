@@ -0,0 +1,509 @@
+import datetime
+import importlib
+import queue
+import re
+import threading
+import time
+from concurrent.futures import Future
+from urllib.parse import urlparse
+
+from clai import prompts
+from clai.converter import convert_docx_bytes
+from clai.fetcher import fetch_posting
+from clai.gemini import generate_json, generate_json_concurrently
+from clai.llm_cache import get_response_cache
+from clai.overlap import DEFAULT_THRESHOLD, containment
+from clai.pipeline import Stage, run_pipeline
+from clai.prefetch import DEFAULT_MAX_PENDING, DEFAULT_WORKERS, Prefetcher
+from clai.renderer import get_renderer
+
+# "single" asks for every field in one structured request; "three" keeps the original
+# extraction -> responseTop -> glazing sequence; "parallel" extracts, then writes
+# responseTop and glazing at the same time and checks their overlap locally
+GENERATION_MODES = ("single", "three", "parallel")
+
+# Default number of worker threads per pipeline stage. Convert workers only queue
+# documents for the shared LibreOffice converter, so several of them let it batch.
+STAGE_WORKERS = {
+    "scrape": 2,
+    "extract": 8,
+    "generate": 8,
+    "render": 1,
+    "convert": 4,
+}
+
+# Job fields each stage produces; these are what the journal records and restores,
+# and a stage whose outputs are already in the job is skipped. Render and convert are
+# cheap enough to redo, so they are not journaled.
+STAGE_OUTPUTS = {
+    "scrape": ["job_description", "posting_fields"],
+    "extract": ["company_name", "position_name", "requirements"],
+    "extract_and_generate": ["company_name", "position_name", "requirements",
+                             "company_name_plural", "generate", "glazing"],
+    "generate": ["company_name_plural", "generate", "glazing"],
+}
+
+# Third-party modules the backends import on first use; preload() can load them early
+HEAVY_MODULES = (
+    "urllib3",
+    "selenium.webdriver",
+    "google.generativeai",
+    "google.ai.generativelanguage",
+    "google.api_core.exceptions",
+    "docxtpl",
+    "pyperclip",
+    "tqdm",
+)
+
+# Path separators and control characters, which must not reach an output file name
+UNSAFE_NAME_CHARS = re.compile(r"[\\/\x00-\x1f]")
+
+# Sentinel that tells the submit() feeder there is no more work
+_CLOSE = object()
+
+
+def preload(modules=HEAVY_MODULES):
+    """
+    Import `modules` on a background thread, e.g. while the user is still typing a URL,
+    so the first letter doesn't wait for them. A module that fails to import is skipped
+    here and reported by the backend that needs it.
+    """
+    def run():
+        for name in modules:
+            try:
+                importlib.import_module(name)
+            except Exception:
+                pass
+
+    thread = threading.Thread(target=run, name="preload", daemon=True)
+    thread.start()
+    return thread
+
+
+def is_valid_url(url):
+    parsed_url = urlparse(url)
+    return all([parsed_url.scheme, parsed_url.netloc])
+
+
+def safe_file_name(name):
+    """
+    `name` reduced to a single file name inside the output directory: path separators
+    and control characters become "-" and runs of dots collapse to one, so company or
+    position names sent to serve.py cannot point outside it.
+    """
+    name = UNSAFE_NAME_CHARS.sub("-", name)
+    name = re.sub(r"\.{2,}", ".", name).strip(" .")
+    return name or "Cover Letter"
+
+
+def short_form_position_name(position_name):
+    # Split the position name into words
+    words = position_name.split()
+
+    # Initialize an empty string to hold the short form
+    short_form = ""
+
+    # List of words to skip (intern, internship, co-op, etc.)
+    skip_words = ["intern", "internship", "co-op", "coop", "student"]
+
+    # Loop through each word in the position name
+    for word in words:
+        # Skip words that contain numbers or special characters
+        if not word.isalpha():
+            continue
+
+        # Check for specific words and apply custom logic
+        if word.lower() == "software":
+            # If the word is "Software", append "SW" to the short form
+            short_form += "SW"
+        elif word.lower() in skip_words:
+            # Skip the word if it's in the skip_words list
+            continue
+        else:
+            # Otherwise, append the first letter of the word
+            short_form += word[0].upper()
+
+    return short_form
+
+
+def plural_company_name(company_name):
+    extension = "'s" if not company_name.endswith('s') else "’"
+    return company_name + extension
+
+
+class PostingFetcher:
+    """
+    Default fetcher backend: plain HTTP first, headless Chrome if the page needs it (see
+    clai.fetcher). fetch() returns the condensed job description with any fields read
+    from the page's structured data, or (None, None) after `max_retries` failed attempts.
+    """
+
+    def __init__(self, max_retries=3):
+        self.max_retries = max_retries
+
+    def fetch(self, url):
+        for attempt in range(1, self.max_retries + 1):
+            job_description, fields = fetch_posting(url)
+            if job_description:
+                return job_description, fields
+            if attempt < self.max_retries:
+                time.sleep(1)  # Optional delay between retries
+        return None, None
+
+
+class GeminiGenerator:
+    """
+    Default generator backend. Every call streams its response through
+    clai.gemini.generate_json, which abandons malformed output early and asks again
+    up to `max_retries` times. In parallel mode, paragraphs whose content-word
+    overlap (clai.overlap.containment) reaches `overlap_threshold` count as overlapping.
+    """
+
+    def __init__(self, max_retries=3, overlap_threshold=DEFAULT_THRESHOLD):
+        self.max_retries = max_retries
+        self.overlap_threshold = overlap_threshold
+
+    def extract_details(self, job_description):
+        """
+        Deduce the company name, position title and requirements from a job description.
+        Returns (company_name, position_name, requirements) or (None, None, None).
+        """
+        ai_prompt = prompts.extraction_prompt(job_description)
+        try:
+            ai_data = generate_json(ai_prompt, prompts.EXTRACTION_SCHEMA, label="extract",
+                                    max_invalid=self.max_retries)
+        except Exception as e:
+            print(f"Error during job detail extraction: {e}")
+            return None, None, None
+        return ai_data['company_name'], ai_data['position_name'], str(ai_data.get('requirements', '')).strip()
+
+    def write_paragraphs(self, company_name, company_name_plural, requirements, job_description):
+        """
+        Run the responseTop and glazing prompts and return both generated paragraphs.
+        Raises ValueError (SchemaViolation) if either never comes back in the expected shape.
+        """
+        # AI generation for responseTop
+        responseTop_prompt = prompts.response_top_prompt(company_name, company_name_plural, requirements,
+                                                         job_description)
+        response_top_sentence = generate_json(responseTop_prompt, prompts.RESPONSE_TOP_SCHEMA,
+                                              prompts.EXPECTED_PREFIXES, use_cache=False,
+                                              label="response_top", max_invalid=self.max_retries)['responseTop']
+
+        # AI generation for glazing
+        glazing_prompt = prompts.glazing_prompt(company_name, company_name_plural, job_description,
+                                                response_top_sentence)
+        glazing_paragraph = generate_json(glazing_prompt, prompts.GLAZING_SCHEMA, prompts.EXPECTED_PREFIXES,
+                                          use_cache=False, label="glazing", max_invalid=self.max_retries)['glazing']
+
+        return response_top_sentence, glazing_paragraph
+
+    def write_paragraphs_parallel(self, company_name, company_name_plural, requirements, job_description):
+        """
+        Like write_paragraphs, but both prompts are sent at the same time, glazing without
+        responseTop to steer away from. The two are then compared locally
+        (clai.overlap.containment), and only if they overlap is glazing written again with
+        responseTop in its prompt, as write_paragraphs does.
+        """
+        responseTop_prompt = prompts.response_top_prompt(company_name, company_name_plural, requirements,
+                                                         job_description)
+        glazing_prompt = prompts.glazing_prompt(company_name, company_name_plural, job_description)
+        response_top, glazing = generate_json_concurrently(
+            dict(prompt=responseTop_prompt, schema=prompts.RESPONSE_TOP_SCHEMA, prefixes=prompts.EXPECTED_PREFIXES,
+                 use_cache=False, label="response_top", max_invalid=self.max_retries),
+            dict(prompt=glazing_prompt, schema=prompts.GLAZING_SCHEMA, prefixes=prompts.EXPECTED_PREFIXES,
+                 use_cache=False, label="glazing", max_invalid=self.max_retries),
+        )
+        response_top_sentence = response_top['responseTop']
+        glazing_paragraph = self.rewrite_overlapping_glazing(company_name, company_name_plural, job_description,
+                                                             response_top_sentence, glazing['glazing'])
+        return response_top_sentence, glazing_paragraph
+
+    def rewrite_overlapping_glazing(self, company_name, company_name_plural, job_description, response_top_sentence,
+                                    glazing_paragraph):
+        """
+        Return `glazing_paragraph`, or a new one written with responseTop in its prompt if
+        the two overlap (clai.overlap.containment). responseTop is the constrained closing
+        sentence, so glazing is the one rewritten; if the rewrite fails the original stays.
+        """
+        overlap = containment(response_top_sentence, glazing_paragraph, ignore=(company_name, company_name_plural))
+        if overlap < self.overlap_threshold:
+            return glazing_paragraph
+        glazing_prompt = prompts.glazing_prompt(company_name, company_name_plural, job_description,
+                                                response_top_sentence)
+        try:
+            return generate_json(glazing_prompt, prompts.GLAZING_SCHEMA, prompts.EXPECTED_PREFIXES, use_cache=False,
+                                 label="glazing_rewrite", max_invalid=self.max_retries)['glazing']
+        except ValueError as e:
+            print(f"Error rewriting overlapping glazing paragraph: {e}")
+            return glazing_paragraph
+
+    def write_letter(self, job_description):
+        """
+        Single-call mode: extract the posting details and write both paragraphs in one
+        schema-constrained request. Returns a dict with company_name, position_name,
+        requirements, responseTop and glazing, or None if no attempt produced all of them.
+        Structured output is generated in alphabetical key order, so glazing is written
+        before responseTop and cannot steer away from it; it is rewritten afterwards if
+        the two overlap.
+        """
+        prompt = prompts.letter_prompt(job_description)
+        try:
+            fields = generate_json(prompt, prompts.LETTER_SCHEMA, prompts.EXPECTED_PREFIXES, use_cache=False,
+                                   generation_config=prompts.LETTER_GENERATION_CONFIG, label="letter",
+                                   max_invalid=self.max_retries)
+        except ValueError as e:
+            print(f"Error parsing single-call response: {e}")
+            return None
+        fields = {key: str(fields.get(key, '')).strip() for key in prompts.LETTER_SCHEMA["required"]}
+        fields["glazing"] = self.rewrite_overlapping_glazing(
+            fields["company_name"], plural_company_name(fields["company_name"]), job_description,
+            fields["responseTop"], fields["glazing"])
+        return fields
+
+
+class LetterResult:
+    """
+    Outcome of one submitted URL. `ok` is False when a stage failed, in which case
+    `failed_stage` and `error` say where and why, and the fields produced before the
+    failure are still filled in.
+    """
+
+    def __init__(self, job, failed_stage=None, error=None):
+        self.url = job.get("url")
+        self.job_description = job.get("job_description")
+        self.company_name = job.get("company_name")
+        self.position_name = job.get("position_name")
+        self.requirements = job.get("requirements")
+        self.response_top = job.get("generate")
+        self.glazing = job.get("glazing")
+        self.document_text = job.get("document_text")
+        self.pdf_path = job.get("output_file_path")
+        self.docx_bytes = job.get("docx_bytes")
+        self.failed_stage = failed_stage
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.failed_stage is None
+
+
+class LetterPipeline:
+    """
+    The scrape -> extract -> generate -> render -> convert engine behind main.py and
+    multigen.py. In single-call mode the extract stage also writes the paragraphs and
+    there is no separate generate stage.
+
+    Every backend is pluggable: `fetcher.fetch(url)`, the generator's extract_details /
+    write_paragraphs / write_paragraphs_parallel / write_letter, `renderer.render(context)` and
+    `converter.convert_bytes(docx_bytes, name, output_dir)`. Left as None they default
+    to PostingFetcher, GeminiGenerator, the compiled template and the shared LibreOffice
+    converter.
+
+    Batches go through run(); one-off letters through submit(), which returns a Future
+    resolved with a LetterResult. Fields passed to submit() (or restored by a journal)
+    skip the stages that would produce them. `on_stage(job, stage_name)` is called
+    whenever a stage finishes or skips a job.
+    """
+
+    def __init__(self, template_path, output_dir, mode="single", fetcher=None, generator=None, renderer=None,
+                 converter=None, workers=None, journal=None, on_stage=None, copy_to_clipboard=True, keep_docx=False):
+        if mode not in GENERATION_MODES:
+            raise ValueError(f"Unknown generation mode '{mode}'")
+        self.template_path = template_path
+        self.output_dir = output_dir
+        self.mode = mode
+        self.fetcher = fetcher or PostingFetcher()
+        self.generator = generator or GeminiGenerator()
+        self.renderer = renderer
+        self.converter = converter
+        self.workers = dict(STAGE_WORKERS, **(workers or {}))
+        self.journal = journal
+        self.on_stage = on_stage
+        self.copy_to_clipboard = copy_to_clipboard
+        self.keep_docx = keep_docx  # Leave the DOCX bytes in the job (and LetterResult) after converting
+        self._inbox = None
+        self._thread = None
+        self._summaries = None
+
+    def _tracked(self, func, stage_name):
+        # Skip work already in the job, journal what the stage produced and report progress
+        outputs = STAGE_OUTPUTS.get(func.__name__)
+
+        def run(job):
+            if outputs and all(key in job for key in outputs):
+                # Finished in an earlier run or supplied by the caller
+                if self.on_stage:
+                    self.on_stage(job, stage_name)
+                return job
+            job = func(job)
+            if outputs and self.journal is not None:
+                self.journal.record_stage(job["url"], func.__name__, {key: job[key] for key in outputs})
+            if self.on_stage:
+                self.on_stage(job, stage_name)
+            return job
+        return run
+
+    def scrape(self, job):
+        job["job_description"], job["posting_fields"] = self.fetcher.fetch(job["url"])
+        if not job["job_description"]:
+            raise ValueError("Unable to scrape job description")
+        return job
+
+    def extract(self, job):
+        fields = job.get("posting_fields")
+        if fields:
+            # Read from the page's structured data, no Gemini call needed
+            company_name, position_name, requirements = fields["company_name"], fields["position_name"], fields["requirements"]
+        else:
+            company_name, position_name, requirements = self.generator.extract_details(job["job_description"])
+        if not company_name or not position_name:
+            raise ValueError("Unable to extract company name or position title")
+        job.update(company_name=company_name, position_name=position_name, requirements=requirements)
+        return job
+
+    def extract_and_generate(self, job):
+        if job.get("company_name") and job.get("position_name"):
+            job.setdefault("requirements", "")
+            return self.generate(job)  # Details entered by hand; only the paragraphs are missing
+        fields = self.generator.write_letter(job["job_description"])
+        if fields is None:
+            raise ValueError("Unable to extract job details and paragraphs")
+        job.update(
+            company_name=fields["company_name"],
+            position_name=fields["position_name"],
+            requirements=fields["requirements"],
+            company_name_plural=plural_company_name(fields["company_name"]),
+            generate=fields["responseTop"],
+            glazing=fields["glazing"],
+        )
+        return job
+
+    def generate(self, job):
+        job["company_name_plural"] = plural_company_name(job["company_name"])
+        if self.mode == "parallel":
+            write_paragraphs = self.generator.write_paragraphs_parallel
+        else:
+            write_paragraphs = self.generator.write_paragraphs
+        job["generate"], job["glazing"] = write_paragraphs(
+            job["company_name"], job["company_name_plural"], job.get("requirements") or "", job["job_description"]
+        )
+        return job
+
+    def render(self, job):
+        position_name = job["position_name"]
+        today = datetime.datetime.today()
+        a = "an" if position_name and position_name[0].upper() in ["A", "E", "I", "O", "U"] else "a"
+
+        context = {
+            "today_date": today.strftime("%B %d, %Y"),
+            "position_name": position_name,
+            "company_name": job["company_name"],
+            "company_name_plural": job["company_name_plural"],
+            "a": a,
+            "generate": job["generate"],
+            "glazing": job["glazing"],
+        }
+
+        # Render the pre-compiled template in memory and copy the text to the clipboard
+        renderer = self.renderer or get_renderer(self.template_path)
+        job["docx_bytes"], job["document_text"] = renderer.render(context)
+        job["output_name"] = safe_file_name(f"{job['company_name']} {position_name} {today.strftime('%Y-%m-%d')}")
+        if self.copy_to_clipboard:
+            import pyperclip
+
+            pyperclip.copy(job["document_text"])
+        return job
+
+    def convert(self, job):
+        # Hand the DOCX bytes straight to LibreOffice; nothing is written next to the PDF
+        docx_bytes = job["docx_bytes"] if self.keep_docx else job.pop("docx_bytes")
+        if self.converter is not None:
+            job["output_file_path"] = self.converter.convert_bytes(docx_bytes, job["output_name"], self.output_dir)
+        else:
+            job["output_file_path"] = convert_docx_bytes(docx_bytes, job["output_name"], self.output_dir)
+        return job
+
+    def enable_prefetch(self, workers=DEFAULT_WORKERS, max_pending=DEFAULT_MAX_PENDING):
+        """
+        Wrap the fetcher in a clai.prefetch.Prefetcher and return it; call its
+        prefetch(url) for URLs that are coming up. Outside single-call mode the prefetch also
+        runs the extraction prompt, whose answer the response cache keeps for the extract
+        stage.
+        """
+        extract = None
+        if self.mode != "single" and get_response_cache() is not None:
+            extract = self.generator.extract_details
+        self.fetcher = Prefetcher(self.fetcher, extract, workers, max_pending)
+        return self.fetcher
+
+    def stages(self, workers=None):
+        """
+        The pipeline stages for this mode, with `workers` threads each (default: the
+        counts given to the constructor). Every stage takes and returns the job dict.
+        """
+        workers = workers or self.workers
+        if self.mode == "single":
+            funcs = {"scrape": self.scrape, "extract": self.extract_and_generate,
+                     "render": self.render, "convert": self.convert}
+        else:
+            funcs = {"scrape": self.scrape, "extract": self.extract, "generate": self.generate,
+                     "render": self.render, "convert": self.convert}
+        return [Stage(name, self._tracked(funcs[name], name), workers[name]) for name in STAGE_WORKERS if name in funcs]
+
+    def run(self, jobs, queue_size=8, on_done=None, on_error=None):
+        """
+        Push a batch of job dicts (each with at least a "url") through the stages and
+        return the per-stage summaries; see clai.pipeline.run_pipeline.
+        """
+        return run_pipeline(jobs, self.stages(), queue_size=queue_size, on_done=on_done, on_error=on_error)
+
+    def start(self, queue_size=8):
+        """
+        Start the stage workers in the background so submit() can feed them.
+        """
+        if self._thread is not None:
+            return self
+        self._inbox = queue.Queue(maxsize=queue_size)
+
+        def feed():
+            while True:
+                job = self._inbox.get()
+                if job is _CLOSE:
+                    return
+                yield job
+
+        def on_done(job):
+            job.pop("future").set_result(LetterResult(job))
+
+        def on_error(job, stage_name, e):
+            job.pop("future").set_result(LetterResult(job, stage_name, e))
+
+        def run():
+            self._summaries = run_pipeline(feed(), self.stages(), queue_size=queue_size,
+                                           on_done=on_done, on_error=on_error)
+
+        self._thread = threading.Thread(target=run, name="letter-pipeline", daemon=True)
+        self._thread.start()
+        return self
+
+    def submit(self, url, **known):
+        """
+        Queue one URL and return a Future resolved with its LetterResult. Keyword
+        arguments are job fields already known (e.g. company_name, position_name or a
+        pasted job_description with posting_fields=None); blocks while the queue is full.
+        """
+        self.start()
+        future = Future()
+        job = dict(known, url=url, future=future)
+        self._inbox.put(job)
+        return future
+
+    def close(self):
+        """
+        Finish the submitted letters, stop the workers and return the stage summaries.
+        """
+        if self._thread is not None:
+            self._inbox.put(_CLOSE)
+            self._thread.join()
+            self._thread = None
+        return self._summaries or []
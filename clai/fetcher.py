@@ -0,0 +1,345 @@
+import codecs
+import re
+import threading
+from html.parser import HTMLParser
+from urllib.parse import urlparse
+
+from clai.condense import condense
+from clai.driver_pool import get_driver_pool
+from clai.metrics import metrics
+from clai.readiness import wait_until_ready
+from clai.scrape_cache import get_scrape_cache
+from clai.structured import STRUCTURED_DATA_JS, StructuredDataParser, posting_fields
+
+# Visible text kept per page before condensing; long enough to reach the requirements at the end
+MAX_PAGE_CHARS = 30000
+
+# Fewer visible characters than this from a plain GET means the page is rendered by JavaScript
+MIN_STATIC_TEXT_CHARS = 500
+
+# Hosts whose postings only render in a real browser, no matter what the HTTP tier returns
+DOMAIN_RULES = {
+    "linkedin.com": "browser",
+    "myworkdayjobs.com": "browser",
+    "jobs.ashbyhq.com": "browser",
+}
+
+# Markers of a client-side rendered app shell in the raw HTML
+SPA_MARKERS = re.compile(
+    r'(enable javascript|javascript is (?:required|disabled)|<div id="(?:root|app|__next)">\s*</div>|ng-app=)',
+    re.IGNORECASE,
+)
+
+# Tags whose contents are never visible text
+SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "head", "iframe"}
+
+# Tags that start a new line in the rendered text
+BLOCK_TAGS = {
+    "p", "div", "br", "li", "ul", "ol", "tr", "table", "section", "article", "header",
+    "footer", "h1", "h2", "h3", "h4", "h5", "h6", "dt", "dd", "blockquote", "pre",
+}
+
+HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/120.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+# One keep-alive connection pool per host, shared by every thread; built on first use
+_http = None
+_http_lock = threading.Lock()
+
+# Tier that last worked for each host ("http" or "browser")
+_domain_tiers = {}
+_domain_tiers_lock = threading.Lock()
+
+
+class HTMLTextExtractor(HTMLParser):
+    """
+    Streaming HTML to text converter. Feed it chunks as they arrive; it keeps only
+    visible text and stops collecting once `max_chars` have been gathered.
+    """
+
+    def __init__(self, max_chars=MAX_PAGE_CHARS):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.parts = []
+        self.length = 0
+        self.skip_depth = 0
+
+    @property
+    def full(self):
+        return self.length >= self.max_chars
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif tag in BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if self.skip_depth or self.full:
+            return
+        self.parts.append(data)
+        self.length += len(data.strip())
+
+    def text(self):
+        lines = "".join(self.parts).splitlines()
+        return "\n".join(" ".join(line.split()) for line in lines if line.strip())
+
+
+def host_of(url):
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def _rule_for(host):
+    for domain, tier in DOMAIN_RULES.items():
+        if host == domain or host.endswith("." + domain):
+            return tier
+    return None
+
+
+def _remember(host, tier):
+    with _domain_tiers_lock:
+        _domain_tiers[host] = tier
+
+
+def needs_javascript(text, raw_head):
+    """
+    Decide whether a page fetched over plain HTTP has to be re-rendered in Chrome.
+    """
+    if len(text) < MIN_STATIC_TEXT_CHARS:
+        return True
+    # A short page that also looks like an app shell is almost certainly incomplete
+    return bool(SPA_MARKERS.search(raw_head)) and len(text) < 3 * MIN_STATIC_TEXT_CHARS
+
+
+def get_http_pool():
+    """
+    Return the shared urllib3 PoolManager, importing urllib3 and creating it on first use.
+    """
+    global _http
+    with _http_lock:
+        if _http is None:
+            import urllib3
+
+            _http = urllib3.PoolManager(
+                num_pools=50,
+                maxsize=8,
+                headers=HTTP_HEADERS,
+                timeout=urllib3.Timeout(connect=5, read=10),
+                retries=urllib3.Retry(total=2, redirect=5, backoff_factor=0.3),
+            )
+        return _http
+
+
+def fetch_http(url):
+    """
+    Fetch the page with the pooled HTTP client and extract its text and structured data
+    while streaming. Returns (text, signals, needs_js): (None, None, False) if the
+    request failed and (None, None, True) if the page came back but needs JavaScript.
+    """
+    import urllib3
+
+    try:
+        response = get_http_pool().request("GET", url, preload_content=False)
+    except urllib3.exceptions.HTTPError as e:
+        print(f"HTTP fetch failed for {url}: {e}")
+        return None, None, False
+
+    try:
+        content_type = response.headers.get("Content-Type", "")
+        if response.status != 200 or "html" not in content_type:
+            return None, None, False
+
+        charset = "utf-8"
+        match = re.search(r"charset=([\w-]+)", content_type)
+        if match:
+            charset = match.group(1)
+        try:
+            decoder = codecs.getincrementaldecoder(charset)(errors="replace")
+        except LookupError:
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+        extractor = HTMLTextExtractor()
+        structured = StructuredDataParser()
+        raw_head = ""
+        for chunk in response.stream(16384):
+            html = decoder.decode(chunk)
+            if len(raw_head) < 65536:
+                raw_head += html
+            extractor.feed(html)
+            structured.feed(html)
+            if extractor.full:
+                break  # Enough text, no need to download the rest of the page
+        extractor.close()
+    except (urllib3.exceptions.HTTPError, OSError) as e:
+        print(f"HTTP fetch failed for {url}: {e}")
+        return None, None, False
+    finally:
+        response.release_conn()
+
+    text = extractor.text()
+    if needs_javascript(text, raw_head):
+        return None, None, True
+    return text[:MAX_PAGE_CHARS], structured.signals(), False
+
+
+# Collects the page text plus every <li> grouped under the closest preceding heading,
+# in a single WebDriver call instead of one call per list item
+EXTRACT_PAGE_JS = STRUCTURED_DATA_JS + """
+const body = document.body;
+if (!body) return {text: "", sections: [], structured: structured};
+const sections = [{heading: "", bullets: []}];
+const walker = document.createTreeWalker(body, NodeFilter.SHOW_ELEMENT);
+for (let el = walker.nextNode(); el; el = walker.nextNode()) {
+    const tag = el.tagName;
+    if (/^H[1-6]$/.test(tag)) {
+        sections.push({heading: el.innerText.trim(), bullets: []});
+    } else if (tag === "LI" && el.closest("ul")) {
+        const item = el.innerText.trim();
+        if (item) sections[sections.length - 1].bullets.push(item);
+    }
+}
+return {text: body.innerText, sections: sections.filter(s => s.bullets.length), structured: structured};
+"""
+
+# Page text and structured data for every other site, also in one call
+PAGE_TEXT_JS = STRUCTURED_DATA_JS + """
+return {text: document.body ? document.body.innerText : "", structured: structured};
+"""
+
+
+def _clean_lines(text):
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+def build_linkedin_description(payload):
+    """
+    Turn the EXTRACT_PAGE_JS payload into the job description: the cleaned page text
+    followed by the list items, which often hold the technical requirements.
+    """
+    lines = _clean_lines(payload.get("text") or "")
+    lines += ["", "Important Items, could potentially be technical skills:"]
+    for section in payload.get("sections") or []:
+        if section.get("heading"):
+            lines.append(section["heading"] + ":")
+        for bullet in section.get("bullets") or []:
+            lines.extend(_clean_lines(bullet))
+
+    return "\n".join(lines)[:MAX_PAGE_CHARS]
+
+
+def fetch_with_browser(url):
+    """
+    Render the page in a pooled headless Chrome. LinkedIn postings get their bullet
+    lists appended separately since those often hold the technical requirements.
+    Returns (text, signals) with the page text and structured data, or (None, None).
+    """
+    from selenium.common.exceptions import TimeoutException, WebDriverException
+
+    pool = get_driver_pool()
+    with metrics.timer("browser.acquire"):
+        driver = pool.acquire()
+    crashed = False
+
+    try:
+        if "linkedin.com" in urlparse(url).netloc:
+            with metrics.timer("browser.navigate"):
+                driver.get(url)
+
+            # Check if the current URL matches the intended URL (to check for redirection to login)
+            if not driver.current_url.startswith(url):
+                # Attempt to reload the page without clearing history
+                with metrics.timer("browser.navigate"):
+                    driver.get(url)
+
+                if not driver.current_url.startswith(url):
+                    return None, None  # Still redirected
+
+            # Wait until the description has rendered instead of a fixed sleep
+            with metrics.timer("browser.ready"):
+                wait_until_ready(driver, url)
+
+            # One round-trip returns the body text and every list item grouped by heading
+            with metrics.timer("browser.extract"):
+                payload = driver.execute_script(EXTRACT_PAGE_JS)
+            return build_linkedin_description(payload), payload.get("structured")
+
+        # For non-LinkedIn URLs, just extract the body content
+        with metrics.timer("browser.navigate"):
+            driver.get(url)
+        with metrics.timer("browser.ready"):
+            wait_until_ready(driver, url)
+
+        with metrics.timer("browser.extract"):
+            payload = driver.execute_script(PAGE_TEXT_JS)
+        return payload["text"][:MAX_PAGE_CHARS], payload.get("structured")
+
+    except Exception as e:
+        print(f"Error extracting job details: {e}")
+        crashed = isinstance(e, WebDriverException) and not isinstance(e, TimeoutException)
+        return None, None
+    finally:
+        # Browsers that crashed are replaced, the rest are reset and reused
+        pool.release(driver, discard=crashed)
+
+
+def fetch_posting(url, use_cache=True):
+    """
+    Return (description, fields) for `url`, the description condensed to the sections
+    that matter (see clai.condense). A fresh copy in the scrape cache is
+    returned without touching the network; otherwise the cheap HTTP tier is tried first,
+    falling back to headless Chrome when it fails or the page needs JavaScript. A host
+    is remembered as "browser" only once a page of it needed JavaScript and Chrome then
+    got the text, so later URLs skip straight to Chrome; transient HTTP failures are
+    not remembered.
+
+    `fields` holds the company name, position name and requirements when the page's
+    structured data gives them with enough confidence (see clai.structured), else None.
+    """
+    cache = get_scrape_cache() if use_cache else None
+    if cache is not None:
+        cached = cache.get(url)
+        if cached is not None:
+            return cached[0], cache.get_fields(url)
+
+    host = host_of(url)
+    with _domain_tiers_lock:
+        tier = _rule_for(host) or _domain_tiers.get(host, "http")
+
+    text, signals, needs_js = None, None, False
+    if tier == "http":
+        with metrics.timer("fetch.http"):
+            text, signals, needs_js = fetch_http(url)
+        if text:
+            _remember(host, "http")
+
+    if not text:
+        text, signals = fetch_with_browser(url)
+        if text and needs_js:
+            _remember(host, "browser")
+
+    fields = None
+    if text:
+        with metrics.timer("extract.structured"):
+            fields = posting_fields(signals, url, text)
+        # Only the relevant sections, within the token budget, are kept and sent to Gemini
+        with metrics.timer("condense"):
+            text = condense(text)
+        if cache is not None:
+            cache.put(url, text, fields)
+    return text, fields
+
@@ -0,0 +1,266 @@
+import asyncio
+import threading
+import time
+
+from clai.condense import estimate_tokens
+from clai.json_stream import SchemaViolation, StreamingJSONParser, parse_json
+from clai.key_pool import KeyPool
+from clai.llm_cache import cache_key, get_response_cache
+from clai.metrics import metrics
+
+# The Gemini SDK (google.generativeai, google.api_core) is slow to import, so it is
+# loaded inside the functions that talk to the API rather than with this module
+DEFAULT_MODEL = "gemini-1.5-flash"
+
+# Requests and tokens per minute allowed for each model (free tier); unknown models use the flash limits
+MODEL_LIMITS = {
+    "gemini-1.5-flash": {"rpm": 15, "tpm": 1000000},
+    "gemini-1.5-flash-8b": {"rpm": 15, "tpm": 1000000},
+    "gemini-1.5-pro": {"rpm": 2, "tpm": 32000},
+}
+
+# Requests one client keeps in flight at once
+DEFAULT_MAX_CONCURRENCY = 8
+
+# Expected completion size used when budgeting tokens before a request is sent
+EXPECTED_OUTPUT_TOKENS = 400
+
+
+def token_usage(usage, prompt, text):
+    """
+    (prompt tokens, output tokens) from a response's usage metadata, estimated from the
+    text when the response carries none.
+    """
+    if usage is not None and usage.prompt_token_count:
+        return usage.prompt_token_count, usage.candidates_token_count
+    return estimate_tokens(prompt), estimate_tokens(text)
+
+
+def _chunk_text(chunk):
+    # Chunks without text parts (e.g. the final one carrying only the finish reason) raise
+    try:
+        return chunk.text
+    except ValueError:
+        return ""
+
+
+class TokenBucket:
+    """
+    Async token bucket refilled continuously at `per_minute` tokens per minute.
+    """
+
+    def __init__(self, per_minute):
+        # A share of a limit can be below one request per minute; a request still needs a whole token
+        self.capacity = max(float(per_minute), 1.0)
+        self.tokens = self.capacity
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+        self._lock = None  # Created inside the event loop on first use
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount=1):
+        amount = min(amount, self.capacity)  # A single oversized request must still get through
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+class GeminiClient:
+    """
+    Async Gemini client bound to one API key. It never touches the global genai
+    configuration, caps in-flight requests with a semaphore and paces requests and
+    tokens to the model's per-minute limits. ResourceExhausted is raised to the caller,
+    which benches the key in the KeyPool and moves the request to another key.
+    """
+
+    def __init__(self, api_key, model_name=DEFAULT_MODEL, rpm=None, tpm=None, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+        limits = MODEL_LIMITS.get(model_name, MODEL_LIMITS[DEFAULT_MODEL])
+        self.api_key = api_key
+        self.model_name = model_name
+        self.max_concurrency = max_concurrency
+        self.request_bucket = TokenBucket(rpm or limits["rpm"])
+        self.token_bucket = TokenBucket(tpm or limits["tpm"])
+        self._model = None
+        self._semaphore = None
+
+    def _ensure_model(self):
+        # grpc asyncio clients bind to the running loop, so build them lazily inside it
+        if self._model is None:
+            import google.generativeai as genai
+            from google.ai import generativelanguage as glm
+
+            self._model = genai.GenerativeModel(self.model_name)
+            self._model._async_client = glm.GenerativeServiceAsyncClient(client_options={"api_key": self.api_key})
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._model
+
+    async def generate_stream(self, prompt, parser, generation_config=None):
+        """
+        Stream the response into `parser` (a StreamingJSONParser) and stop reading as soon
+        as the JSON object closes. Returns `(text, (prompt_tokens, output_tokens))`; a
+        SchemaViolation raised by the parser abandons the stream at once.
+        """
+        model = self._ensure_model()
+        tokens = estimate_tokens(prompt) + EXPECTED_OUTPUT_TOKENS
+
+        async with self._semaphore:
+            await self.request_bucket.acquire(1)
+            await self.token_bucket.acquire(tokens)
+            response = await model.generate_content_async(prompt, generation_config=generation_config, stream=True)
+            usage = None
+            async for chunk in response:
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                if parser.feed(_chunk_text(chunk)):
+                    break  # The object is complete; dropping the response cancels the rest
+            text = parser.text()
+            return text, token_usage(usage, prompt, text)
+
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop():
+    """
+    Event loop running on a background thread; synchronous callers submit coroutines to
+    it so requests from many worker threads share one set of clients and limiters.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="gemini-loop", daemon=True).start()
+        return _loop
+
+
+def run_sync(coro):
+    """
+    Run a coroutine on the background Gemini loop and wait for its result.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
+
+
+_pool = None
+_model_name = DEFAULT_MODEL
+
+
+def configure_gemini(api_keys, model_name=DEFAULT_MODEL, max_concurrency=DEFAULT_MAX_CONCURRENCY, client_factory=None,
+                     processes=1):
+    """
+    Create one GeminiClient per API key and the KeyPool that schedules across them.
+    Call once before the first generation; any number of keys is supported. When
+    `processes` processes share the same keys, each is paced to 1/processes of every
+    key's per-minute limits so together they stay within the quota.
+    `client_factory(api_key, model_name, max_concurrency=..., rpm=..., tpm=...)` replaces
+    GeminiClient, e.g. with the offline stand-in used by the benchmarks.
+    """
+    global _pool, _model_name
+    keys = [key for key in api_keys if key]
+    if not keys:
+        raise ValueError("No Gemini API key configured; add one to api_keys")
+    client_factory = client_factory or GeminiClient
+    limits = MODEL_LIMITS.get(model_name, MODEL_LIMITS[DEFAULT_MODEL])
+    rpm, tpm = limits["rpm"] / processes, limits["tpm"] / processes
+    _pool = KeyPool([client_factory(key, model_name, max_concurrency=max_concurrency, rpm=rpm, tpm=tpm)
+                     for key in keys])
+    _model_name = model_name
+
+
+def key_stats():
+    """
+    Per-key usage stats (see KeyPool.stats), or an empty list before configure_gemini().
+    """
+    return _pool.stats() if _pool is not None else []
+
+
+async def generate_json_async(prompt, schema=None, prefixes=None, use_cache=True, generation_config=None,
+                              label="generate", max_attempts=6, max_invalid=3):
+    """
+    Async version of generate_json for callers already running on the Gemini loop.
+    """
+    start = time.perf_counter()
+    cache = get_response_cache() if use_cache else None
+    key = cache_key(_model_name, prompt, generation_config)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            try:
+                data = parse_json(cached, schema, prefixes)
+                metrics.record_call(label, time.perf_counter() - start, cached=True)
+                return data
+            except SchemaViolation:
+                pass  # Cached before the schema changed; ask again
+
+    if _pool is None:
+        raise RuntimeError("configure_gemini() must be called before generating")
+    from google.api_core.exceptions import ResourceExhausted
+
+    invalid = 0
+    for attempt in range(max_attempts):
+        api_key = await _pool.acquire()
+        parser = StreamingJSONParser(schema, prefixes)
+        try:
+            text, (prompt_tokens, output_tokens) = await api_key.client.generate_stream(prompt, parser,
+                                                                                       generation_config)
+            data = parser.result()
+        except ResourceExhausted:
+            print(f"Quota exhausted for API key {api_key.index + 1}.")
+            _pool.release(api_key, exhausted=True)
+            continue
+        except SchemaViolation as e:
+            # The key worked; only the output was bad, so ask again straight away
+            _pool.release(api_key, tokens=estimate_tokens(prompt) + estimate_tokens(parser.text()))
+            invalid += 1
+            if invalid >= max_invalid:
+                metrics.record_call(label, time.perf_counter() - start, retries=attempt, ok=False)
+                raise
+            print(f"Discarding malformed response ({e}), retrying.")
+            continue
+        except Exception:
+            _pool.release(api_key)
+            metrics.record_call(label, time.perf_counter() - start, retries=attempt, ok=False)
+            raise
+        _pool.release(api_key, tokens=prompt_tokens + output_tokens)
+        metrics.record_call(label, time.perf_counter() - start, retries=attempt,
+                            prompt_tokens=prompt_tokens, output_tokens=output_tokens)
+        if cache is not None:
+            cache.put(key, text)
+        return data
+
+    metrics.record_call(label, time.perf_counter() - start, retries=max_attempts - 1, ok=False)
+    print("Max retries reached. Could not complete the request.")
+    raise Exception("Max retries reached.")
+
+
+def generate_json(prompt, schema=None, prefixes=None, use_cache=True, generation_config=None, label="generate",
+                  max_invalid=3):
+    """
+    Stream a JSON response and return it parsed. The output is checked while it streams
+    (see clai.json_stream): unexpected or missing keys, values not starting with their
+    `prefixes` and placeholder brackets abort the response and ask again, up to
+    `max_invalid` times before SchemaViolation is raised. Reading stops as soon as the
+    object closes. Safe to call from many threads.
+    """
+    return run_sync(generate_json_async(prompt, schema, prefixes, use_cache, generation_config, label,
+                                        max_invalid=max_invalid))
+
+
+def generate_json_concurrently(*requests):
+    """
+    Run several generate_json calls at the same time, each given as a dict of its
+    keyword arguments, and return their results in order. The first exception raised
+    by any of them is re-raised.
+    """
+    async def gather():
+        return await asyncio.gather(*(generate_json_async(**request) for request in requests))
+    return run_sync(gather())
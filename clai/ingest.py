@@ -0,0 +1,140 @@
+import hashlib
+import os
+import re
+import sys
+import time
+from urllib.parse import parse_qs, urlparse
+
+from clai.urls import normalize_url
+
+# Job IDs that identify a posting no matter how the URL around them is dressed up
+JOB_ID_PATTERNS = [
+    ("linkedin", re.compile(r"linkedin\.com/(?:.*/)?jobs/view/(?:[^/]*-)?(\d+)")),
+    ("greenhouse", re.compile(r"greenhouse\.io/(?:[^/]+/)?(?:[^/]+)/jobs/(\d+)")),
+    ("lever", re.compile(r"jobs\.lever\.co/([^/]+/[0-9a-f-]{36})")),
+    ("ashby", re.compile(r"jobs\.ashbyhq\.com/([^/]+/[0-9a-f-]{36})")),
+    # Requisition numbers are only unique within one Workday tenant, so the tenant is part of the key
+    ("workday", re.compile(r"//([^./]+)\.(?:wd\d+\.)?myworkdayjobs\.com/.*_(R-?\d+)")),
+]
+
+
+def posting_key(url):
+    """
+    De-duplication key for a posting: "<board>:<job id>" when a known job ID is in the
+    URL (for Workday "workday:<tenant>/<job id>"), otherwise the normalized URL.
+    """
+    normalized = normalize_url(url)
+    current_job_id = parse_qs(urlparse(normalized).query).get("currentJobId")
+    if current_job_id and "linkedin.com" in normalized:
+        return "linkedin:" + current_job_id[0]
+    for board, pattern in JOB_ID_PATTERNS:
+        match = pattern.search(normalized)
+        if match:
+            return f"{board}:{'/'.join(match.groups())}"
+    return normalized
+
+
+def _digest(key):
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class SeenSet:
+    """
+    Compact set of posting keys: only a 64-bit hash of each key is kept, so millions of
+    URLs fit in memory. A false duplicate needs a 64-bit collision.
+    """
+
+    def __init__(self):
+        self._digests = set()
+
+    def add(self, key):
+        """
+        Add `key`; returns False if it was already present.
+        """
+        digest = _digest(key)
+        if digest in self._digests:
+            return False
+        self._digests.add(digest)
+        return True
+
+    def __len__(self):
+        return len(self._digests)
+
+
+def parse_shard(spec):
+    """
+    Parse "i/N" (1-based) into (i - 1, N).
+    """
+    match = re.fullmatch(r"\s*(\d+)\s*/\s*(\d+)\s*", spec or "")
+    if not match or not 1 <= int(match.group(1)) <= int(match.group(2)):
+        raise ValueError(f"Invalid shard '{spec}', expected i/N with 1 <= i <= N")
+    return int(match.group(1)) - 1, int(match.group(2))
+
+
+def in_shard(key, shard):
+    """
+    Deterministic shard assignment: every worker hashing the same key agrees on its shard.
+    """
+    index, count = shard
+    return count == 1 or _digest(key) % count == index
+
+
+def read_lines(path):
+    with open(path, "r") as file:
+        for line in file:
+            yield line
+
+
+def watch_directory(path, poll_seconds=2.0):
+    """
+    Yield lines from every *.txt file in `path`, including files added later, until
+    interrupted with Ctrl-C. Each file is read once.
+    """
+    read = set()
+    try:
+        while True:
+            for name in sorted(os.listdir(path)):
+                full = os.path.join(path, name)
+                if name.endswith(".txt") and full not in read and os.path.isfile(full):
+                    read.add(full)
+                    for line in read_lines(full):
+                        yield line
+            time.sleep(poll_seconds)
+    except KeyboardInterrupt:
+        return
+
+
+def open_source(source):
+    """
+    Line iterator for a URL source: "-" for stdin, a directory to watch, or a file.
+    """
+    if source == "-":
+        return iter(sys.stdin)
+    if os.path.isdir(source):
+        return watch_directory(source)
+    return read_lines(source)
+
+
+def iter_urls(lines, is_valid_url, shard=(0, 1), seen=None, on_skip=None):
+    """
+    Stream cleaned URLs out of `lines`: blank lines and # comments are dropped, invalid
+    URLs and duplicates (by posting_key) are skipped, and only URLs in `shard` are kept.
+    `on_skip(url, reason)` is called for every skipped URL.
+    """
+    seen = seen if seen is not None else SeenSet()
+    for line in lines:
+        url = line.strip()
+        if not url or url.startswith("#"):
+            continue
+        if not is_valid_url(url):
+            if on_skip:
+                on_skip(url, "invalid")
+            continue
+        key = posting_key(url)
+        if not in_shard(key, shard):
+            continue
+        if not seen.add(key):
+            if on_skip:
+                on_skip(url, "duplicate")
+            continue
+        yield url
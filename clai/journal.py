@@ -0,0 +1,102 @@
+import json
+import os
+import threading
+import time
+
+from clai.urls import normalize_url
+
+
+class BatchJournal:
+    """
+    Append-only JSONL record of a batch run. Every finished stage appends the outputs
+    it produced for a URL, and every URL ends with a "done" or "failed" line. Lines are
+    flushed and fsynced as they are written, so after a crash a restart can rebuild each
+    URL's progress and skip the work that already happened. A torn last line from a crash
+    mid-write is cut off on load.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._state = {}  # normalized url -> {"fields", "status", "error"}, for unfinished and failed URLs
+        self._done = set()  # Normalized URLs that finished; their outputs are only needed on disk
+        self._load()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        complete = 0  # Bytes up to the end of the last whole line
+        with open(self.path, "rb+") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Torn last line from a crash mid-write
+                complete += len(line)
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                self._apply(entry)
+            # Cut the torn line off so the next record starts on a line of its own
+            f.truncate(complete)
+
+    def _apply(self, entry):
+        key, event = entry["key"], entry["event"]
+        if event == "done":
+            # A finished URL is never resumed, so drop its outputs (the whole job
+            # description among them) and keep memory flat over long batches
+            self._state.pop(key, None)
+            self._done.add(key)
+            return
+        if key in self._done:
+            return  # In process mode a stage line can land after the URL's done line
+        state = self._state.setdefault(key, {"fields": {}, "status": None, "error": None})
+        if event == "stage":
+            # Only add outputs: a stage line landing after a failed line must not reset its status
+            state["fields"].update(entry.get("data") or {})
+        elif event == "failed":
+            state["status"] = event
+            state["error"] = entry.get("error")
+
+    def _append(self, entry):
+        entry["ts"] = time.time()
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            self._apply(entry)
+            self._file.write(line + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def record_stage(self, url, stage, data):
+        self._append({"event": "stage", "key": normalize_url(url), "url": url, "stage": stage, "data": data})
+
+    def record_done(self, url, output_path=None):
+        self._append({"event": "done", "key": normalize_url(url), "url": url, "data": {"output_path": output_path}})
+
+    def record_failed(self, url, stage, error):
+        self._append({"event": "failed", "key": normalize_url(url), "url": url, "stage": stage, "error": str(error)})
+
+    def status(self, url):
+        """
+        "done", "failed" or None (never seen or still in progress) for `url`.
+        """
+        key = normalize_url(url)
+        with self._lock:
+            if key in self._done:
+                return "done"
+            state = self._state.get(key)
+            return state["status"] if state else None
+
+    def resume(self, url):
+        """
+        Job dict to restart `url` from, holding the outputs of every stage that finished.
+        """
+        with self._lock:
+            state = self._state.get(normalize_url(url))
+            job = dict(state["fields"]) if state else {}
+        job["url"] = url
+        return job
+
+    def close(self):
+        with self._lock:
+            self._file.close()
@@ -0,0 +1,191 @@
+import json
+import re
+
+# Non-whitespace characters tolerated before the opening brace (a ```json fence, a word or two)
+MAX_PREAMBLE_CHARS = 40
+
+# Generic placeholders the prompts forbid, e.g. "[Programming Language]" or "[Skills]":
+# bracketed words, one of which is a template word. Real names in brackets ("[C++]",
+# "[Go]") are left alone.
+PLACEHOLDER = re.compile(r"\[([A-Za-z][A-Za-z /'-]{0,40})\]")
+PLACEHOLDER_WORDS = frozenset("""
+achievement achievements area company experience field framework frameworks goal goals industry insert
+language languages mission name platform position product project relevant role skill skills specific
+team technologies technology title tool tools value values x your
+""".split())
+
+# Longest placeholder, brackets included; only this much of a value is searched when a "]" arrives
+MAX_PLACEHOLDER_CHARS = 43
+
+
+def find_placeholder(text):
+    """
+    First template placeholder in `text`, or None.
+    """
+    for match in PLACEHOLDER.finditer(text):
+        if any(word in PLACEHOLDER_WORDS for word in re.split(r"[ /'-]+", match.group(1).lower())):
+            return match.group(0)
+    return None
+
+
+class SchemaViolation(ValueError):
+    """
+    The model's output departed from the expected JSON shape; the request should be retried.
+    """
+
+
+class StreamingJSONParser:
+    """
+    Checks a JSON object as it streams in, one chunk at a time, so a bad response can be
+    abandoned after a few tokens instead of after the whole completion.
+
+    `schema` uses the same format as Gemini's response_schema ("properties" and
+    "required"); keys outside "properties" and missing required keys are violations.
+    `prefixes` maps keys to the text their string value must start with. String values
+    containing template placeholders such as "[Skills]" are violations as well. feed()
+    returns True once the top-level object has closed; anything after it is ignored.
+    """
+
+    def __init__(self, schema=None, prefixes=None):
+        schema = schema or {}
+        self.properties = set(schema.get("properties") or ())
+        self.required = list(schema.get("required") or ())
+        self.prefixes = prefixes or {}
+        self.buffer = []
+        self.start = None  # Index of the opening brace within the joined buffer
+        self.length = 0
+        self.done = False
+        self.preamble = 0
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.expect = "key"  # What comes next at depth 1: key, colon, value or comma
+        self.string_is_key = False
+        self.string_chars = []
+        self.key = None
+        self.keys = []
+
+    def feed(self, text):
+        if self.done:
+            return True
+        for ch in text:
+            self.buffer.append(ch)
+            self.length += 1
+            if self.start is None:
+                if ch == "{":
+                    self.start = self.length - 1
+                    self.depth = 1
+                elif not ch.isspace():
+                    self.preamble += 1
+                    if self.preamble > MAX_PREAMBLE_CHARS:
+                        raise SchemaViolation("Response does not start with a JSON object")
+                continue
+            self._step(ch)
+            if self.done:
+                return True
+        return False
+
+    def _step(self, ch):
+        if self.in_string:
+            if self.escape:
+                self.escape = False
+            elif ch == "\\":
+                self.escape = True
+            elif ch == '"':
+                self.in_string = False
+                if self.depth == 1:
+                    self._end_string("".join(self.string_chars))
+                return
+            if self.depth == 1:
+                self.string_chars.append(ch)
+                if not self.string_is_key:
+                    self._check_partial(self.key, ch)
+            return
+
+        if ch == '"':
+            self.in_string = True
+            self.string_chars = []
+            self.string_is_key = self.depth == 1 and self.expect == "key"
+            if self.depth == 1 and self.expect == "value":
+                self.expect = "comma"
+        elif ch in "{[":
+            self.depth += 1
+            if self.depth == 2 and self.expect == "value":
+                self.expect = "comma"
+        elif ch in "}]":
+            self.depth -= 1
+            if self.depth == 0:
+                self._close()
+        elif self.depth == 1:
+            if ch == ":":
+                self.expect = "value"
+            elif ch == ",":
+                self.expect = "key"
+            elif not ch.isspace() and self.expect == "value":
+                self.expect = "comma"  # Number, boolean or null
+
+    def _end_string(self, text):
+        if self.string_is_key:
+            if self.properties and text not in self.properties:
+                raise SchemaViolation(f"Unexpected key '{text}' in response")
+            self.key = text
+            self.keys.append(text)
+            self.expect = "colon"
+        else:
+            self._check_value(self.key, text)
+
+    def _check_partial(self, key, ch):
+        # Called for every character of a value, so it only looks at what the new one can
+        # change: the first few characters against the prefix, and the tail when a "]" arrives
+        prefix = self.prefixes.get(key)
+        if prefix and len(self.string_chars) <= len(prefix) + 8:
+            self._check_prefix(key, prefix, "".join(self.string_chars))
+        if ch == "]":
+            placeholder = find_placeholder("".join(self.string_chars[-MAX_PLACEHOLDER_CHARS:]))
+            if placeholder:
+                raise SchemaViolation(f"'{key}' contains a placeholder: {placeholder}")
+
+    def _check_prefix(self, key, prefix, text, complete=False):
+        head = text.lstrip()[:len(prefix)]
+        if not prefix.lower().startswith(head.lower()) or (complete and len(head) < len(prefix)):
+            raise SchemaViolation(f"'{key}' should start with \"{prefix}\"")
+
+    def _check_value(self, key, text):
+        prefix = self.prefixes.get(key)
+        if prefix:
+            self._check_prefix(key, prefix, text, complete=True)
+        placeholder = find_placeholder(text)
+        if placeholder:
+            raise SchemaViolation(f"'{key}' contains a placeholder: {placeholder}")
+        if key in self.required and not text.strip():
+            raise SchemaViolation(f"'{key}' is empty")
+
+    def _close(self):
+        missing = [key for key in self.required if key not in self.keys]
+        if missing:
+            raise SchemaViolation(f"Response is missing {', '.join(missing)}")
+        self.done = True
+
+    def text(self):
+        """
+        The JSON object exactly as received, from its opening to its closing brace.
+        """
+        return "".join(self.buffer[self.start:self.length]) if self.start is not None else ""
+
+    def result(self):
+        if not self.done:
+            raise SchemaViolation("Response ended before the JSON object was complete")
+        try:
+            data = json.loads(self.text())
+        except ValueError as e:
+            raise SchemaViolation(f"Invalid JSON in response: {e}")
+        return {key: value.strip() if isinstance(value, str) else value for key, value in data.items()}
+
+
+def parse_json(text, schema=None, prefixes=None):
+    """
+    Validate a complete response the same way and return the parsed object.
+    """
+    parser = StreamingJSONParser(schema, prefixes)
+    parser.feed(text)
+    return parser.result()
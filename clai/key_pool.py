@@ -0,0 +1,121 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+
+# How long a key rests after a quota error; doubles on each consecutive error up to the cap
+COOLDOWN_SECONDS = 30.0
+MAX_COOLDOWN_SECONDS = 600.0
+
+# Usage is reported over this sliding window, matching the per-minute quotas
+USAGE_WINDOW_SECONDS = 60.0
+
+
+class KeyState:
+    """
+    Usage and health of one API key.
+    """
+
+    def __init__(self, client, index):
+        self.client = client
+        self.index = index
+        self.in_flight = 0
+        self.total_requests = 0
+        self.total_tokens = 0
+        self.quota_errors = 0
+        self.consecutive_errors = 0
+        self.cooldown_until = 0.0
+        self.recent = deque()  # (timestamp, tokens) inside the usage window
+
+    def _trim(self, now):
+        while self.recent and now - self.recent[0][0] > USAGE_WINDOW_SECONDS:
+            self.recent.popleft()
+
+    def healthy(self, now):
+        return now >= self.cooldown_until
+
+    def load(self, now):
+        """
+        Sort key for scheduling: fewest requests in flight, then fewest in the last minute.
+        """
+        self._trim(now)
+        return (self.in_flight, len(self.recent), self.index)
+
+    def stats(self, now):
+        self._trim(now)
+        return {
+            "key": self.index + 1,
+            "in_flight": self.in_flight,
+            "requests": self.total_requests,
+            "tokens": self.total_tokens,
+            "requests_last_minute": len(self.recent),
+            "tokens_last_minute": sum(tokens for _, tokens in self.recent),
+            "quota_errors": self.quota_errors,
+            "cooling_down_for": round(max(0.0, self.cooldown_until - now), 1),
+        }
+
+
+class KeyPool:
+    """
+    Spreads requests across any number of API keys. Each request goes to the least
+    loaded key that is not cooling down. A key that hits its quota is benched for a
+    growing cooldown window while the other keys carry on.
+    """
+
+    def __init__(self, clients):
+        if not clients:
+            raise ValueError("KeyPool needs at least one client")
+        self.keys = [KeyState(client, i) for i, client in enumerate(clients)]
+        self._lock = threading.Lock()
+
+    def _pick(self):
+        now = time.monotonic()
+        with self._lock:
+            healthy = [k for k in self.keys if k.healthy(now)]
+            if not healthy:
+                return None, min(k.cooldown_until for k in self.keys) - now
+            key = min(healthy, key=lambda k: k.load(now))
+            key.in_flight += 1
+            return key, 0.0
+
+    async def acquire(self):
+        """
+        Wait for a healthy key and reserve a slot on it. Pair with release().
+        """
+        while True:
+            key, wait = self._pick()
+            if key is not None:
+                return key
+            # Every key is cooling down; sleep until the first one recovers (plus jitter)
+            await asyncio.sleep(wait + random.uniform(0, 1))
+
+    def release(self, key, tokens=0, exhausted=False):
+        now = time.monotonic()
+        with self._lock:
+            key.in_flight -= 1
+            key.total_requests += 1
+            if exhausted:
+                key.quota_errors += 1
+                key.consecutive_errors += 1
+                cooldown = min(MAX_COOLDOWN_SECONDS, COOLDOWN_SECONDS * 2 ** (key.consecutive_errors - 1))
+                key.cooldown_until = now + cooldown
+            else:
+                key.consecutive_errors = 0
+                key.total_tokens += tokens
+                key.recent.append((now, tokens))
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return [k.stats(now) for k in self.keys]
+
+
+def print_key_stats(stats):
+    """
+    Print the per-key usage table returned by KeyPool.stats().
+    """
+    print("\nGemini API key usage:")
+    print(f"{'key':<5}{'requests':>10}{'tokens':>10}{'quota errors':>14}")
+    for s in stats:
+        print(f"{s['key']:<5}{s['requests']:>10}{s['tokens']:>10}{s['quota_errors']:>14}")
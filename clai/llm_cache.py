@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from clai import CACHE_DIR
+
+DEFAULT_PATH = os.path.join(CACHE_DIR, "llm_cache.sqlite3")
+DEFAULT_MAX_BYTES = 20 * 1024 * 1024
+
+
+def cache_key(model_name, prompt, params=None):
+    """
+    Key for one generation: the model, a hash of the prompt and the generation
+    parameters, so changing any of them is a miss.
+    """
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    payload = json.dumps({"model": model_name, "prompt": prompt_hash, "params": params or {}}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Interface shared by the response cache backends. Subclasses implement _get/_put;
+    this class keeps the hit and miss counters.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def get(self, key):
+        value = self._get(key)
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self._put(key, value)
+
+    def stats(self):
+        with self._stats_lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+    def _get(self, key):
+        raise NotImplementedError
+
+    def _put(self, key, value):
+        raise NotImplementedError
+
+
+class MemoryResponseCache(ResponseCache):
+    """
+    In-process LRU cache, useful for a single run or when the disk is read-only.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        super().__init__()
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def _put(self, key, value):
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old.encode("utf-8"))
+            self._entries[key] = value
+            self._size += size
+            while self._size > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.encode("utf-8"))
+
+
+class SQLiteResponseCache(ResponseCache):
+    """
+    Persistent cache shared across runs (and processes) in a single SQLite file.
+    The least recently used responses are evicted once the total passes `max_bytes`.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        super().__init__()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access);
+        """)
+
+    def _get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            return row[0]
+
+    def _put(self, key, value):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, len(value.encode("utf-8")), time.time()),
+            )
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                # Walk the oldest entries until enough bytes have been freed
+                excess = total - self.max_bytes
+                doomed = []
+                for old_key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_access"):
+                    doomed.append((old_key,))
+                    excess -= size
+                    if excess <= 0:
+                        break
+                self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+            self._conn.commit()
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """
+    Return the process-wide response cache. Set CLAI_LLM_CACHE=memory for an in-process
+    cache or CLAI_LLM_CACHE=off to disable caching entirely (returns None).
+    """
+    global _shared_cache
+    backend = os.environ.get("CLAI_LLM_CACHE", "sqlite").lower()
+    if backend == "off":
+        return None
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = MemoryResponseCache() if backend == "memory" else SQLiteResponseCache()
+        return _shared_cache
@@ -0,0 +1,167 @@
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Percentiles reported for every timed span
+PERCENTILES = (50, 95, 99)
+
+# Bumped whenever the layout of the JSON report changes, so old reports can still be compared
+REPORT_VERSION = 1
+
+
+def percentile(values, p):
+    """
+    Nearest-rank percentile of `values` (0 for an empty list).
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(values):
+    """
+    Count, total, mean, max and the PERCENTILES of a list of durations, rounded to ms.
+    """
+    summary = {
+        "count": len(values),
+        "total_seconds": round(sum(values), 3),
+        "mean_seconds": round(sum(values) / len(values), 3) if values else 0.0,
+        "max_seconds": round(max(values), 3) if values else 0.0,
+    }
+    for p in PERCENTILES:
+        summary[f"p{p}_seconds"] = round(percentile(values, p), 3)
+    return summary
+
+
+class RunMetrics:
+    """
+    Timings for every instrumented step of a run (browser startup, navigation, each
+    Gemini call, rendering, conversion, ...) plus retries and token usage per Gemini
+    call. Safe to record into from many threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._spans = {}  # name -> list of seconds
+        self._failures = {}  # name -> spans that raised
+        self._calls = {}  # label -> {"calls", "cached", "retries", "prompt_tokens", "output_tokens"}
+        self.started = time.time()
+
+    def record(self, name, seconds, ok=True):
+        with self._lock:
+            self._spans.setdefault(name, []).append(seconds)
+            if not ok:
+                self._failures[name] = self._failures.get(name, 0) + 1
+
+    @contextmanager
+    def timer(self, name):
+        """
+        Time the body of a `with` block as one sample of `name`; an exception still
+        counts the sample, as a failure.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.record(name, time.perf_counter() - start, ok=False)
+            raise
+        self.record(name, time.perf_counter() - start)
+
+    def record_call(self, label, seconds, retries=0, prompt_tokens=0, output_tokens=0, cached=False, ok=True):
+        """
+        Record one Gemini call: its latency as the span "gemini.<label>", plus how many
+        times it was retried and the tokens it used.
+        """
+        self.record(f"gemini.{label}", seconds, ok)
+        with self._lock:
+            entry = self._calls.setdefault(label, {"calls": 0, "cached": 0, "retries": 0,
+                                                   "prompt_tokens": 0, "output_tokens": 0})
+            entry["calls"] += 1
+            entry["retries"] += retries
+            entry["prompt_tokens"] += prompt_tokens
+            entry["output_tokens"] += output_tokens
+            if cached:
+                entry["cached"] += 1
+
+    def drain(self):
+        """
+        Return everything recorded so far as plain data and start over. Worker processes
+        send this to the parent after each job, which merges it into its own metrics.
+        """
+        with self._lock:
+            snapshot = {"spans": self._spans, "failures": self._failures, "calls": self._calls}
+            self._spans, self._failures, self._calls = {}, {}, {}
+        return snapshot
+
+    def merge(self, snapshot):
+        with self._lock:
+            for name, values in snapshot["spans"].items():
+                self._spans.setdefault(name, []).extend(values)
+            for name, count in snapshot["failures"].items():
+                self._failures[name] = self._failures.get(name, 0) + count
+            for label, counts in snapshot["calls"].items():
+                entry = self._calls.setdefault(label, dict.fromkeys(counts, 0))
+                for field, value in counts.items():
+                    entry[field] = entry.get(field, 0) + value
+
+    def report(self, **extra):
+        """
+        Machine-readable summary of the run: per-span latency percentiles and per-label
+        Gemini usage. Keyword arguments (e.g. stage summaries) are added as-is.
+        """
+        with self._lock:
+            spans = {name: dict(summarize(values), failed=self._failures.get(name, 0))
+                     for name, values in sorted(self._spans.items())}
+            calls = {label: dict(counts) for label, counts in sorted(self._calls.items())}
+
+        totals = {"calls": 0, "cached": 0, "retries": 0, "prompt_tokens": 0, "output_tokens": 0}
+        for counts in calls.values():
+            for field in totals:
+                totals[field] += counts.get(field, 0)
+
+        report = {
+            "version": REPORT_VERSION,
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "wall_seconds": round(time.time() - self.started, 3),
+            "spans": spans,
+            "gemini": {"total": totals, "by_label": calls},
+        }
+        report.update(extra)
+        return report
+
+
+def write_report(path, report):
+    """
+    Write `report` as JSON, replacing the file atomically so a reader never sees half of it.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+def print_latency_report(report):
+    """
+    Print the span table and Gemini totals from a report built by RunMetrics.report().
+    """
+    if not report["spans"]:
+        return
+    print("\nLatency:")
+    print(f"{'span':<26}{'count':>7}{'failed':>8}{'p50 s':>8}{'p95 s':>8}{'p99 s':>8}{'max s':>8}")
+    for name, s in report["spans"].items():
+        print(f"{name[:25]:<26}{s['count']:>7}{s['failed']:>8}{s['p50_seconds']:>8.2f}"
+              f"{s['p95_seconds']:>8.2f}{s['p99_seconds']:>8.2f}{s['max_seconds']:>8.2f}")
+
+    total = report["gemini"]["total"]
+    if total["calls"]:
+        print(f"Gemini: {total['calls']} calls ({total['cached']} cached), {total['retries']} retries, "
+              f"{total['prompt_tokens']} prompt + {total['output_tokens']} output tokens")
+
+
+metrics = RunMetrics()
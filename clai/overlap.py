@@ -0,0 +1,53 @@
+import os
+import re
+
+# Share of the shorter paragraph's content words that may also appear in the other
+# before the two count as overlapping; override with CLAI_OVERLAP_THRESHOLD. On
+# responseTop/glazing pairs written separately this stays below 0.2, while a glazing
+# paragraph that restates the responseTop sentence in other words scores 0.6 or more.
+DEFAULT_THRESHOLD = float(os.environ.get("CLAI_OVERLAP_THRESHOLD", "0.35"))
+
+WORD = re.compile(r"[a-z0-9+#]+(?:'[a-z]+)?")
+
+# Function words, plus the wording every paragraph must use ("I am eager to leverage",
+# "I am drawn by"), which say nothing about whether two paragraphs repeat each other
+STOP_WORDS = frozenset("""
+a about after all also am an and any are as at be because been being both but by can could did do does
+doing each eager for from further had has have having help here how i i'm if in into is it its itself just
+leverage drawn make me more most my myself no nor not now of off on once only or other our ours out over own
+same she should so some such than that the their theirs them then there these they this those through to too
+under until up us very want was we were what when where which while who whom why will with would you your
+""".split())
+
+# Suffixes removed so "systems" matches "system" and "building" matches "build"
+SUFFIXES = ("ing", "ed", "es", "s")
+
+
+def stem(word):
+    word = word.split("'")[0]
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[:-len(suffix)]
+    return word
+
+
+def content_words(text, ignore=()):
+    """
+    Set of stemmed content words in `text`, leaving out stop words and the words of
+    every string in `ignore` (e.g. the company name, which both paragraphs must use).
+    """
+    ignored = {stem(word) for phrase in ignore for word in WORD.findall(phrase.lower())}
+    words = {stem(word) for word in WORD.findall(text.lower()) if word not in STOP_WORDS}
+    return words - ignored
+
+
+def containment(a, b, ignore=()):
+    """
+    Overlap (0 to 1) of two texts: the share of the smaller set of content words that
+    the other text also uses. Unlike Jaccard over the union, a short sentence restated
+    inside a longer paragraph scores high.
+    """
+    a, b = content_words(a, ignore), content_words(b, ignore)
+    if not a or not b:
+        return 0.0
+    return len(a & b) / min(len(a), len(b))
@@ -0,0 +1,254 @@
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from clai.metrics import PERCENTILES, metrics, percentile
+
+# Sentinel pushed through the queues to tell a worker there is no more input
+_DONE = object()
+
+
+class Stage:
+    """
+    One step of the batch pipeline. `func` receives a job dict, mutates or replaces it
+    and returns it for the next stage. Raising marks the job as failed at this stage.
+    """
+
+    def __init__(self, name, func, workers=1):
+        if workers < 1:
+            raise ValueError(f"Stage '{name}' needs at least one worker")
+        self.name = name
+        self.func = func
+        self.workers = workers
+
+
+class StageStats:
+    """
+    Counters collected for a single stage while the pipeline runs.
+    """
+
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.completed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0  # Summed across all workers of the stage
+        self.samples = []  # Seconds per job, for the latency percentiles
+        self.lock = threading.Lock()
+
+    def record(self, elapsed, ok):
+        with self.lock:
+            self.busy_seconds += elapsed
+            self.samples.append(elapsed)
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    def summary(self, wall_seconds):
+        processed = self.completed + self.failed
+        summary = {
+            "stage": self.name,
+            "workers": self.workers,
+            "completed": self.completed,
+            "failed": self.failed,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "avg_seconds": round(self.busy_seconds / processed, 3) if processed else 0.0,
+            "throughput_per_min": round(self.completed / wall_seconds * 60, 2) if wall_seconds else 0.0,
+        }
+        for p in PERCENTILES:
+            summary[f"p{p}_seconds"] = round(percentile(self.samples, p), 3)
+        return summary
+
+
+def run_pipeline(items, stages, queue_size=8, on_done=None, on_error=None):
+    """
+    Push every item through `stages` in order. Each stage runs its own pool of worker
+    threads and hands jobs to the next stage through a bounded queue, so a slow stage
+    applies back-pressure instead of letting the earlier ones pile up work in memory.
+
+    `on_done(job)` is called for jobs that made it through every stage and
+    `on_error(job, stage_name, exc)` for jobs that raised. Returns the list of stage
+    summaries (see StageStats.summary) once all workers have exited.
+    """
+    if not stages:
+        raise ValueError("run_pipeline needs at least one stage")
+
+    queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+    stats = [StageStats(stage.name, stage.workers) for stage in stages]
+    callback_lock = threading.Lock()
+
+    # Number of workers still alive per stage; the last one out closes the next queue
+    remaining = [stage.workers for stage in stages]
+    remaining_lock = threading.Lock()
+
+    def worker(index):
+        stage = stages[index]
+        inbox = queues[index]
+        outbox = queues[index + 1] if index + 1 < len(stages) else None
+
+        while True:
+            job = inbox.get()
+            if job is _DONE:
+                break
+
+            start = time.perf_counter()
+            try:
+                job = stage.func(job)
+            except Exception as e:
+                stats[index].record(time.perf_counter() - start, ok=False)
+                if on_error:
+                    with callback_lock:
+                        on_error(job, stage.name, e)
+                continue
+            stats[index].record(time.perf_counter() - start, ok=True)
+
+            if outbox is not None:
+                outbox.put(job)
+            elif on_done:
+                with callback_lock:
+                    on_done(job)
+
+        with remaining_lock:
+            remaining[index] -= 1
+            last_worker = remaining[index] == 0
+        if last_worker and outbox is not None:
+            for _ in range(stages[index + 1].workers):
+                outbox.put(_DONE)
+
+    threads = []
+    for index, stage in enumerate(stages):
+        for n in range(stage.workers):
+            thread = threading.Thread(target=worker, args=(index,), name=f"{stage.name}-{n + 1}", daemon=True)
+            thread.start()
+            threads.append(thread)
+
+    wall_start = time.perf_counter()
+
+    # Feed the first stage; put() blocks while the queue is full
+    for item in items:
+        queues[0].put(item)
+    for _ in range(stages[0].workers):
+        queues[0].put(_DONE)
+
+    for thread in threads:
+        thread.join()
+
+    wall_seconds = time.perf_counter() - wall_start
+    return [s.summary(wall_seconds) for s in stats]
+
+
+# Stages built by the setup function in each worker process
+_process_stages = None
+
+
+class _EventSink:
+    """
+    Journal stand-in handed to stages inside a worker process; forwards every
+    record_stage call to the parent, which owns the real journal.
+    """
+
+    def __init__(self, events):
+        self.events = events
+
+    def record_stage(self, url, stage, data):
+        self.events.put((url, stage, data))
+
+
+def _process_init(setup, setup_args, events):
+    global _process_stages
+    _process_stages = setup(*setup_args, _EventSink(events))
+
+
+def _process_job(job):
+    # Run one job through every stage in this worker; failures come back as strings
+    # because arbitrary exceptions don't always pickle. The metrics recorded while the
+    # job ran travel back with it so the parent can report on the whole run
+    timings = []
+    for stage in _process_stages:
+        start = time.perf_counter()
+        try:
+            job = stage.func(job)
+        except Exception as e:
+            timings.append((stage.name, time.perf_counter() - start, False))
+            return job, stage.name, f"{type(e).__name__}: {e}", timings, metrics.drain()
+        timings.append((stage.name, time.perf_counter() - start, True))
+    return job, None, None, timings, metrics.drain()
+
+
+def run_in_processes(items, processes, setup, setup_args=(), on_done=None, on_error=None, on_event=None,
+                     max_pending=None):
+    """
+    Run whole jobs in a pool of `processes` worker processes. Each worker calls
+    `setup(*setup_args, journal)` once to warm its own resources and build its stages,
+    then runs every job it receives through all of them in order.
+
+    Callbacks run in the parent: `on_done(job)`, `on_error(job, stage_name, message)`
+    and `on_event(url, stage, data)` for each stage output a worker records. At most
+    `max_pending` jobs (default 2 per process) are queued ahead, so `items` can be an
+    endless stream. Returns the same per-stage summaries as run_pipeline; the workers'
+    span timings and Gemini usage are merged into this process's clai.metrics.
+    """
+    context = multiprocessing.get_context("spawn")  # Fresh interpreters; Chrome and threads don't survive fork
+    events = context.Queue()
+    max_pending = max_pending or 2 * processes
+    stats = {}
+
+    def drain_events():
+        while True:
+            event = events.get()
+            if event is None:
+                break
+            if on_event:
+                on_event(*event)
+
+    drainer = threading.Thread(target=drain_events, name="process-events", daemon=True)
+    drainer.start()
+
+    def collect(futures, submitted):
+        for future in futures:
+            item = submitted.pop(future)
+            try:
+                job, failed_stage, message, timings, job_metrics = future.result()
+            except Exception as e:  # The worker process itself died
+                if on_error:
+                    on_error(item, "process", f"{type(e).__name__}: {e}")
+                continue
+            metrics.merge(job_metrics)
+            for name, elapsed, ok in timings:
+                stats.setdefault(name, StageStats(name, processes)).record(elapsed, ok)
+            if failed_stage is None:
+                if on_done:
+                    on_done(job)
+            elif on_error:
+                on_error(job, failed_stage, message)
+
+    wall_start = time.perf_counter()
+    with ProcessPoolExecutor(processes, mp_context=context, initializer=_process_init,
+                             initargs=(setup, setup_args, events)) as pool:
+        submitted = {}
+        for item in items:
+            submitted[pool.submit(_process_job, item)] = item
+            if len(submitted) >= max_pending:
+                done, _ = wait(list(submitted), return_when=FIRST_COMPLETED)
+                collect(done, submitted)
+        done, _ = wait(list(submitted))
+        collect(done, submitted)
+
+    events.put(None)
+    drainer.join()
+    wall_seconds = time.perf_counter() - wall_start
+    return [s.summary(wall_seconds) for s in stats.values()]
+
+
+def print_stage_report(summaries):
+    """
+    Print the per-stage throughput table produced by run_pipeline.
+    """
+    print("\nStage throughput:")
+    print(f"{'stage':<10}{'workers':>8}{'done':>7}{'failed':>8}{'avg s':>9}{'per min':>10}")
+    for s in summaries:
+        print(f"{s['stage']:<10}{s['workers']:>8}{s['completed']:>7}{s['failed']:>8}"
+              f"{s['avg_seconds']:>9.2f}{s['throughput_per_min']:>10.2f}")
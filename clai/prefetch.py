@@ -0,0 +1,104 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from clai.urls import normalize_url
+
+# Speculative fetches pending at once; further prefetch() calls are ignored until one is claimed
+DEFAULT_MAX_PENDING = 4
+
+# Background fetches at once. Browser-tier pages also wait for a free browser in the
+# shared DriverPool, so prefetching never starts more Chrome instances than the pool allows
+DEFAULT_WORKERS = 1
+
+
+class Prefetcher:
+    """
+    Fetcher backend that scrapes URLs before the pipeline asks for them. prefetch(url)
+    starts `fetcher.fetch(url)` in the background, followed by `extract(job_description)`
+    when the page had no structured fields (used to warm the Gemini response cache).
+    fetch(url) then hands over that result, waiting for it if it is already running, and
+    fetches normally for URLs that were never prefetched or whose turn had not come yet.
+    A prefetch that failed is handed over as the failure; the fetcher already retried it.
+
+    At most `max_pending` URLs are prefetched at a time.
+    """
+
+    def __init__(self, fetcher, extract=None, workers=DEFAULT_WORKERS, max_pending=DEFAULT_MAX_PENDING):
+        self.fetcher = fetcher
+        self.extract = extract
+        self.max_pending = max_pending
+        self.hits = 0
+        self.failed = 0
+        self.misses = 0
+        self.skipped = 0
+        self._pending = {}  # Normalized URL -> Future of (job_description, fields)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+
+    def _work(self, url):
+        job_description, fields = self.fetcher.fetch(url)
+        if job_description and not fields and self.extract is not None:
+            try:
+                self.extract(job_description)
+            except Exception:
+                pass  # Speculative; the extract stage will try again for real
+        return job_description, fields
+
+    def prefetch(self, url):
+        """
+        Start fetching `url` in the background. Returns False if it was already pending
+        or the limit of pending URLs was reached.
+        """
+        key = normalize_url(url)
+        with self._lock:
+            if key in self._pending:
+                return False
+            if len(self._pending) >= self.max_pending:
+                self.skipped += 1
+                return False
+            self._pending[key] = self._executor.submit(self._work, url)
+        return True
+
+    def fetch(self, url):
+        with self._lock:
+            future = self._pending.pop(normalize_url(url), None)
+        # A prefetch still waiting for a worker is cancelled and done here instead
+        if future is not None and not future.cancel():
+            try:
+                job_description, fields = future.result()
+            except Exception as e:
+                print(f"Prefetch failed for {url}: {e}")
+                job_description, fields = None, None
+            with self._lock:
+                if job_description:
+                    self.hits += 1
+                else:
+                    self.failed += 1
+            return job_description, fields
+        with self._lock:
+            self.misses += 1
+        return self.fetcher.fetch(url)
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "failed": self.failed, "misses": self.misses, "skipped": self.skipped,
+                    "pending": len(self._pending)}
+
+    def close(self):
+        with self._lock:
+            for future in self._pending.values():
+                future.cancel()
+            self._pending.clear()
+        self._executor.shutdown(wait=False)
+
+
+def prefetching(jobs, prefetcher):
+    """
+    Yield `jobs` unchanged, starting a prefetch for each one as it is handed out. Fed to
+    run_pipeline, this covers the jobs waiting in the bounded scrape queue, the next
+    known URLs; jobs whose description was restored from the journal are skipped.
+    """
+    for job in jobs:
+        if "job_description" not in job:
+            prefetcher.prefetch(job["url"])
+        yield job
@@ -0,0 +1,197 @@
+"""
+Prompt templates sent to Gemini. Every builder returns the stripped prompt text.
+"""
+
+def extraction_prompt(job_description):
+    return f"""
+Extract the company name and position title from the following text.
+
+Text:
+{job_description}
+
+Instructions:
+- Focus **only** on the core job posting content. Ignore sections related to government forms, surveys, legal disclaimers, and any non-job-related information.
+- The **company name** and **job title** are typically mentioned at the beginning of the job posting. Extract these from the relevant section of the text.
+- The **company name** will typically be a name you recognize, it won't be a generic term like "Engineering" or "Software", it would specifically be a name of a company.
+  - Note that if the company name repeatedly says "LinkedIn" or "Simplify", this may be because that is the site that is hosting the posting and not the company itself.
+  - The company is not typically named LinkedIn, do not name it LinkedIn unless you are absolutely confident
+- For the **company name**, simplify it by removing legal terms like 'Inc.', 'LLC', 'Ltd.', or words like 'Markets', 'Corporation', etc.
+- For the **position title**, rephrase it into a standard format. Use terms like 'Software Engineering Intern' or 'Software Engineer', removing extra details like hyphens, department, location, or year.
+  - Ensure that the position title is phrased so it fits naturally in the sentence, “I'm excited to join the team as a {{position}}.”
+- Also, for the **position title**, if the job posting is **overly specific or niche** (e.g., "Front-End Software Engineer District 2 Webview Editing"), simplify it to the **general role** (e.g., "Front-End Software Engineer"). Focus on the broader job role instead of hyper-specific department names, project names, or locations.
+  - For example, "Software Engineering Intern, Web" should be rephrased to "Software Engineering Intern"
+  - For example, "Software Developer Intern - Cybersecurity" should be rephrased to "Software Developer Intern"
+  - For example, "2025 Summer Software Engineer" should be rephrased to "Software Engineer"
+- For the **position title**, ensure that the word "co-op" is replaced with the word "intern"
+  - For example, "Software Developer Co-op" should be rephrased to "Software Developer Intern"
+- For the **requirements**, try to find technical skills in the job description. If you can't find any, think of specific requirements for the type of job
+- You should **ignore** sections that contain unrelated information such as:
+  - Legal disclaimers
+  - Equal Employment Opportunity (EEO) statements
+  - Government forms, surveys, or voluntary self-identification forms
+  - Privacy policy notices or links
+  - Any additional instructions or forms
+
+Provide the output in the **exact JSON format** below without any extra explanations:
+{{
+    "company_name": "Simplified Company Name",
+    "position_name": "Simplified Position Title",
+    "requirements": "List of Requirements"
+}}
+
+Ensure the response is valid JSON.
+""".strip()
+
+
+def response_top_prompt(company_name, company_name_plural, requirements, job_description):
+    return f"""
+Using the job description provided below, generate a final concluding sentence for a paragraph in my cover letter. This sentence should highlight how my skills and qualifications align with the job description, technical skills, and requirements.
+
+**Important guidelines**:
+- **Do not copy** or repeat exact phrases from the job description, technical skills, or requirements.
+- Extract relevant technical and soft skills from: "{requirements}".
+    - If no skills are found, move on without adding any.
+    - **Use specific skills or technologies mentioned in the job description**, such as programming languages, frameworks, or tools, instead of using placeholders like "[Programming Language]" or "[Skills]".
+    - No square brackets or generic placeholders should appear in the final sentence.
+- **Summarize** how my background fits the role without repeating the job description's details.
+- **Do not describe the company** or the position.
+- Refer to the company as "{company_name}".
+    - Use "{company_name_plural}" as the plural.
+- The sentence **must** start with **"I am eager to leverage..."**.
+Your sentence should **add value** to the existing content of the cover letter and conclude the paragraph meaningfully.
+
+**Important**: The sentence must be complete, with no need for further input.
+**Important**: You must **only** return the result in **valid JSON format**. No additional text, explanations, or commentary should be included—**just the JSON response**. The response must follow this structure exactly, including the correct curly braces and the key **"responseTop"**.
+
+Job Description:
+{job_description}
+
+If the output is not in valid JSON format, the response will be considered incorrect.
+
+Return the response **only** in the following format:
+```json
+{{
+  "responseTop": "Generated sentence here."
+}}
+""".strip()
+
+
+def glazing_prompt(company_name, company_name_plural, job_description, response_top_sentence=None):
+    # Without response_top_sentence the paragraph can be written at the same time as it;
+    # the engine then checks the two for overlap itself
+    avoid = ""
+    if response_top_sentence is not None:
+        avoid = (f'\nAvoid overlap in content, structure, or concepts with "{response_top_sentence}", '
+                 "ensuring no similarities in phrasing, wording or ideas.")
+    return f"""
+Using the company values and goals provided in the job description below, generate a paragraph for my cover letter that highlights how my personal values and professional goals align with the company's motives and objectives.
+
+**Important guidelines**:
+- **Do not copy or repeat** the company's values or goals word-for-word from the job description, if necessary: rephrase.
+- **Paraphrase and rephrase** the company's values/goals, and focus on aligning them with my own values and ambitions.
+- **Do not describe the company** in detail (e.g., no mentioning of their history, products, or services).
+- Refer to the company as "{company_name}".
+    - Use "{company_name_plural}" as the plural.
+- **Limit the response to 2-3 sentences only**. Keep the paragraph concise and to the point.
+- The sentence **must** start with **"I am drawn by...."**.
+Your paragraph should demonstrate how my personal goals, values, and professional mission align with the company's broader objectives and should flow smoothly as part of a professional cover letter.
+
+**Important**: You must **only** return the result in **valid JSON format**. No other text, explanations, or commentary should be included—**just the JSON response**. The response must be structured exactly like the format below, including the correct curly braces and the key **"glazing"**.
+
+Job Description:
+{job_description}
+
+If the output is not in valid JSON format, the response will be considered incorrect.{avoid}
+
+Return the response **only** in the following format:
+```json
+{{
+  "glazing": "Generated paragraph here."
+}}
+""".strip()
+
+
+# Keys expected back from each prompt, in the format Gemini's response_schema expects;
+# clai.json_stream checks streamed responses against them
+EXTRACTION_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "company_name": {"type": "STRING"},
+        "position_name": {"type": "STRING"},
+        "requirements": {"type": "STRING"},
+    },
+    "required": ["company_name", "position_name"],
+}
+
+RESPONSE_TOP_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {"responseTop": {"type": "STRING"}},
+    "required": ["responseTop"],
+}
+
+GLAZING_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {"glazing": {"type": "STRING"}},
+    "required": ["glazing"],
+}
+
+# How the prompts require the generated paragraphs to start; a response that opens
+# differently is abandoned as soon as it diverges
+EXPECTED_PREFIXES = {
+    "responseTop": "I am eager to leverage",
+    "glazing": "I am drawn by",
+}
+
+# Response schema for the single-call mode
+LETTER_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "company_name": {"type": "STRING"},
+        "position_name": {"type": "STRING"},
+        "requirements": {"type": "STRING"},
+        "responseTop": {"type": "STRING"},
+        "glazing": {"type": "STRING"},
+    },
+    "required": ["company_name", "position_name", "requirements", "responseTop", "glazing"],
+}
+
+# generation_config that constrains the single-call response to LETTER_SCHEMA
+LETTER_GENERATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": LETTER_SCHEMA,
+}
+
+
+def letter_prompt(job_description):
+    return f"""
+Using the job posting text below, extract the posting details and write two pieces of my cover letter, all in one response.
+
+Text:
+{job_description}
+
+**Extraction** (fields "company_name", "position_name", "requirements"):
+- Focus **only** on the core job posting content. Ignore government forms, surveys, legal disclaimers, Equal Employment Opportunity (EEO) statements, privacy notices and any other non-job-related information.
+- The **company name** will typically be a name you recognize, not a generic term like "Engineering" or "Software".
+  - If the text repeatedly says "LinkedIn" or "Simplify", that is probably the site hosting the posting, not the company. Do not name it LinkedIn unless you are absolutely confident.
+- Simplify the **company name** by removing legal terms like 'Inc.', 'LLC', 'Ltd.', or words like 'Markets', 'Corporation', etc.
+- Rephrase the **position title** into a standard, general format such as 'Software Engineering Intern' or 'Software Engineer', removing hyphens, department, location, year or project names.
+  - It must fit naturally in the sentence “I'm excited to join the team as a {{position}}.”
+  - For example, "Software Developer Intern - Cybersecurity" becomes "Software Developer Intern" and "2025 Summer Software Engineer" becomes "Software Engineer".
+  - Replace the word "co-op" with "intern", e.g. "Software Developer Co-op" becomes "Software Developer Intern".
+- For the **requirements**, list the technical skills in the job description. If there are none, think of specific requirements for the type of job.
+
+**responseTop**: a final concluding sentence for a paragraph in my cover letter highlighting how my skills and qualifications align with the job description, technical skills and requirements.
+- It **must** start with **"I am eager to leverage..."**.
+- Use specific skills or technologies from the requirements. No square brackets or generic placeholders like "[Programming Language]" or "[Skills]".
+- **Do not copy** exact phrases from the job description and **do not describe the company** or the position.
+- Refer to the company by the extracted company name.
+- The sentence must be complete, with no need for further input.
+
+**glazing**: a 2-3 sentence paragraph highlighting how my personal values and professional goals align with the company's motives and objectives.
+- It **must** start with **"I am drawn by...."**.
+- Paraphrase the company's values and goals instead of repeating them word-for-word, and **do not describe the company** (no history, products, or services).
+- Refer to the company by the extracted company name.
+- Keep it about values and goals, not skills or technologies, so it covers different ground from responseTop.
+
+Return **only** a JSON object with the keys "company_name", "position_name", "requirements", "responseTop" and "glazing".
+""".strip()
@@ -0,0 +1,244 @@
+import threading
+import time
+from urllib.parse import urlparse
+
+# Selenium is imported inside the functions that use it, as in clai.driver_pool
+DEFAULT_TIMEOUT = 10.0
+POLL_SECONDS = 0.1
+
+# Resolves once the DOM has gone `quiet` ms without a mutation, or with false after `timeout` ms
+MUTATION_QUIET_JS = """
+const quiet = arguments[0], timeout = arguments[1], done = arguments[arguments.length - 1];
+let timer = null, hard = null;
+const observer = new MutationObserver(() => {
+    clearTimeout(timer);
+    timer = setTimeout(() => finish(true), quiet);
+});
+function finish(ok) {
+    observer.disconnect();
+    clearTimeout(timer);
+    clearTimeout(hard);
+    done(ok);
+}
+observer.observe(document, {childList: true, subtree: true, characterData: true});
+timer = setTimeout(() => finish(true), quiet);
+hard = setTimeout(() => finish(false), timeout);
+"""
+
+
+class Strategy:
+    """
+    A way of deciding that a page has finished rendering. wait() returns True when the
+    page became ready and False when the timeout ran out first; `timeout` overrides the
+    strategy's own for this call.
+    """
+
+    name = "strategy"
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT):
+        self.timeout = timeout
+
+    def wait(self, driver, timeout=None):
+        raise NotImplementedError
+
+
+class SelectorReady(Strategy):
+    """
+    Ready once an element matching the CSS selector is present.
+    """
+
+    name = "selector"
+
+    def __init__(self, selector, timeout=DEFAULT_TIMEOUT):
+        super().__init__(timeout)
+        self.selector = selector
+
+    def wait(self, driver, timeout=None):
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        try:
+            WebDriverWait(driver, timeout or self.timeout, poll_frequency=POLL_SECONDS).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, self.selector))
+            )
+            return True
+        except TimeoutException:
+            return False
+
+
+class _StablePoll(Strategy):
+    """
+    Polls a JavaScript expression until its value stops changing for `quiet` seconds.
+    """
+
+    expression = None
+
+    def __init__(self, quiet=0.5, minimum=0, timeout=DEFAULT_TIMEOUT):
+        super().__init__(timeout)
+        self.quiet = quiet
+        self.minimum = minimum
+
+    def wait(self, driver, timeout=None):
+        deadline = time.monotonic() + (timeout or self.timeout)
+        last_value, stable_since = None, time.monotonic()
+        while time.monotonic() < deadline:
+            value = driver.execute_script(self.expression) or 0
+            now = time.monotonic()
+            if value != last_value:
+                last_value, stable_since = value, now
+            elif value >= self.minimum and now - stable_since >= self.quiet:
+                return True
+            time.sleep(POLL_SECONDS)
+        return False
+
+
+class TextStable(_StablePoll):
+    """
+    Ready once the visible text length has stopped changing (and reached `minimum`).
+    """
+
+    name = "text_stable"
+    expression = "return document.body ? document.body.innerText.length : 0;"
+
+
+class NetworkIdle(_StablePoll):
+    """
+    Ready once no new network requests have started for `quiet` seconds.
+    """
+
+    name = "network_idle"
+    # The resource timing buffer stops recording at 250 entries by default, which would
+    # look like an idle network on busy pages
+    expression = ("performance.setResourceTimingBufferSize(100000); "
+                  "return performance.getEntriesByType('resource').length;")
+
+
+class MutationQuiet(Strategy):
+    """
+    Ready once a MutationObserver has seen no DOM changes for `quiet` seconds.
+    """
+
+    name = "mutation_quiet"
+
+    def __init__(self, quiet=0.5, timeout=DEFAULT_TIMEOUT):
+        super().__init__(timeout)
+        self.quiet = quiet
+
+    def wait(self, driver, timeout=None):
+        timeout = timeout or self.timeout
+        driver.set_script_timeout(timeout + 5)
+        return bool(driver.execute_async_script(MUTATION_QUIET_JS, int(self.quiet * 1000), int(timeout * 1000)))
+
+
+class AllOf(Strategy):
+    """
+    Runs several strategies in order against one overall deadline (by default the
+    longest of their timeouts): each gets only the time left, and the first one that
+    times out ends the wait.
+    """
+
+    def __init__(self, *strategies, timeout=None):
+        super().__init__(timeout or max(s.timeout for s in strategies))
+        self.strategies = strategies
+        self.name = "+".join(s.name for s in strategies)
+
+    def wait(self, driver, timeout=None):
+        deadline = time.monotonic() + (timeout or self.timeout)
+        for strategy in self.strategies:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not strategy.wait(driver, remaining):
+                return False
+        return True
+
+
+# Per-site strategies, matched against the end of the host name
+SITE_STRATEGIES = {
+    "linkedin.com": AllOf(SelectorReady(".description__text, .show-more-less-html__markup, .jobs-description"),
+                          TextStable(quiet=0.3)),
+    "greenhouse.io": SelectorReady("#content, .job__description, #app_body"),
+    "lever.co": SelectorReady(".posting-page, .section-wrapper"),
+    "myworkdayjobs.com": SelectorReady('[data-automation-id="jobPostingDescription"]', timeout=15),
+    "ashbyhq.com": AllOf(SelectorReady("[class*='descriptionText']"), TextStable(quiet=0.3)),
+    # Single-page apps whose markup has no stable selector for the description: wait for
+    # the API calls that fetch it to finish, then for the DOM to settle
+    "workable.com": AllOf(NetworkIdle(quiet=0.5), MutationQuiet(quiet=0.3)),
+    "smartrecruiters.com": AllOf(NetworkIdle(quiet=0.5), MutationQuiet(quiet=0.3)),
+}
+DEFAULT_STRATEGY = MutationQuiet(quiet=0.5)
+
+
+def strategy_for(url):
+    host = urlparse(url).netloc.lower()
+    for domain, strategy in SITE_STRATEGIES.items():
+        if host == domain or host.endswith("." + domain):
+            return strategy
+    return DEFAULT_STRATEGY
+
+
+class ReadinessMetrics:
+    """
+    How long pages actually took to become ready, per host.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts = {}  # host -> {"strategy", "waits", "total", "max", "timeouts"}
+
+    def record(self, host, strategy_name, seconds, ready):
+        with self._lock:
+            entry = self._hosts.setdefault(host, {"strategy": strategy_name, "waits": 0, "total": 0.0, "max": 0.0, "timeouts": 0})
+            entry["waits"] += 1
+            entry["total"] += seconds
+            entry["max"] = max(entry["max"], seconds)
+            if not ready:
+                entry["timeouts"] += 1
+
+    def summary(self):
+        with self._lock:
+            return [
+                {
+                    "host": host,
+                    "strategy": e["strategy"],
+                    "waits": e["waits"],
+                    "avg_seconds": round(e["total"] / e["waits"], 3),
+                    "max_seconds": round(e["max"], 3),
+                    "timeouts": e["timeouts"],
+                }
+                for host, e in sorted(self._hosts.items())
+            ]
+
+
+metrics = ReadinessMetrics()
+
+
+def wait_until_ready(driver, url):
+    """
+    Block until the page loaded from `url` is ready according to its site strategy.
+    Returns True if it became ready, False if the strategy timed out (the caller
+    still scrapes whatever rendered).
+    """
+    from selenium.common.exceptions import TimeoutException
+
+    strategy = strategy_for(url)
+    start = time.monotonic()
+    try:
+        ready = strategy.wait(driver)
+    except TimeoutException:
+        ready = False
+    metrics.record(urlparse(url).netloc.lower(), strategy.name, time.monotonic() - start, ready)
+    return ready
+
+
+def print_readiness_report(summary):
+    """
+    Print the per-host table returned by metrics.summary().
+    """
+    if not summary:
+        return
+    print("\nPage readiness:")
+    print(f"{'host':<32}{'strategy':<28}{'pages':>6}{'avg s':>8}{'max s':>8}{'timeouts':>10}")
+    for s in summary:
+        print(f"{s['host'][:31]:<32}{s['strategy'][:27]:<28}{s['waits']:>6}{s['avg_seconds']:>8.2f}"
+              f"{s['max_seconds']:>8.2f}{s['timeouts']:>10}")
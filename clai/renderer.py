@@ -0,0 +1,92 @@
+import io
+import re
+import threading
+import zipfile
+import xml.etree.ElementTree as ET
+
+from clai.metrics import metrics
+
+WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+# Parts of the package that may contain Jinja tags
+TEMPLATED_PARTS = re.compile(r"^word/(document|header\d*|footer\d*|footnotes|endnotes)\.xml$")
+
+
+def paragraphs_text(document_xml):
+    """
+    Plain text of the top-level body paragraphs of a rendered word/document.xml, the
+    same text python-docx gives for `[p.text for p in Document(...).paragraphs]`.
+    """
+    body = ET.fromstring(document_xml).find(f"{WORD_NS}body")
+    paragraphs = []
+    for p in body.findall(f"{WORD_NS}p"):
+        parts = []
+        for el in p.iter():
+            if el.tag == f"{WORD_NS}t" and el.text:
+                parts.append(el.text)
+            elif el.tag == f"{WORD_NS}tab":
+                parts.append("\t")
+            elif el.tag in (f"{WORD_NS}br", f"{WORD_NS}cr"):
+                parts.append("\n")
+        paragraphs.append("".join(parts))
+    return "\n".join(paragraphs).strip()
+
+
+class TemplateRenderer:
+    """
+    Renders the Word template entirely in memory.
+
+    The template is read and compiled once: every XML part with Jinja tags goes through
+    docxtpl's tag clean-up and is compiled to a jinja2 Template; the other parts are kept
+    as raw bytes. Rendering a letter then only evaluates the compiled templates and zips
+    the result into a BytesIO.
+    """
+
+    def __init__(self, template_path):
+        # docxtpl pulls in python-docx and lxml; only load them once a template is needed
+        import jinja2
+        from docxtpl import DocxTemplate
+
+        self.template_path = template_path
+        env = jinja2.Environment(autoescape=True)  # Escape &, < and > so the XML stays valid
+        patcher = DocxTemplate(template_path)
+
+        self._parts = []  # (ZipInfo, raw bytes or compiled jinja2.Template)
+        with zipfile.ZipFile(template_path) as archive:
+            for info in archive.infolist():
+                data = archive.read(info)
+                if TEMPLATED_PARTS.match(info.filename) and b"{" in data:
+                    xml = patcher.patch_xml(data.decode("utf-8"))
+                    self._parts.append((info, env.from_string(xml)))
+                else:
+                    self._parts.append((info, data))
+
+    def render(self, context):
+        """
+        Render `context` and return (docx_bytes, document_text).
+        """
+        with metrics.timer("render"):
+            buffer = io.BytesIO()
+            document_xml = None
+            with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+                for info, part in self._parts:
+                    data = part if isinstance(part, bytes) else part.render(context).encode("utf-8")
+                    if info.filename == "word/document.xml":
+                        document_xml = data
+                    archive.writestr(info, data)
+            return buffer.getvalue(), paragraphs_text(document_xml) if document_xml else ""
+
+
+_renderers = {}
+_renderers_lock = threading.Lock()
+
+
+def get_renderer(template_path):
+    """
+    Return the compiled TemplateRenderer for `template_path`, building it on first use.
+    """
+    with _renderers_lock:
+        renderer = _renderers.get(template_path)
+        if renderer is None:
+            renderer = _renderers[template_path] = TemplateRenderer(template_path)
+        return renderer
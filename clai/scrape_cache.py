@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from clai import CACHE_DIR
+from clai.urls import normalize_url
+
+DEFAULT_PATH = os.path.join(CACHE_DIR, "scrape_cache.sqlite3")
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600  # Postings rarely change within a week
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+
+
+class ScrapeCache:
+    """
+    On-disk cache of cleaned job descriptions keyed by normalized URL.
+
+    Descriptions are stored once per content hash, so the same posting reached through
+    different URLs costs a single copy. Entries expire after `ttl` seconds, and the least
+    recently used URLs are evicted once the stored text grows past `max_bytes`.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, ttl=DEFAULT_TTL_SECONDS, max_bytes=DEFAULT_MAX_BYTES):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS contents (
+                content_hash TEXT PRIMARY KEY,
+                description TEXT NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS fields (
+                url TEXT PRIMARY KEY,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS pages_last_access ON pages (last_access);
+        """)
+
+    def get(self, url):
+        """
+        Return (description, fetched_at, content_hash) for a fresh entry, else None.
+        """
+        key = normalize_url(url)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT c.description, p.fetched_at, p.content_hash FROM pages p "
+                "JOIN contents c ON c.content_hash = p.content_hash WHERE p.url = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl:
+                self._delete(key)
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE pages SET last_access = ? WHERE url = ?", (now, key))
+            self._conn.commit()
+        return row
+
+    def get_fields(self, url):
+        """
+        Structured posting fields stored with the page by put(), or None.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM fields WHERE url = ?", (normalize_url(url),)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, url, description, fields=None):
+        key = normalize_url(url)
+        content_hash = hashlib.sha256(description.encode("utf-8")).hexdigest()
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO contents (content_hash, description, size) VALUES (?, ?, ?)",
+                (content_hash, description, len(description.encode("utf-8"))),
+            )
+            old = self._conn.execute("SELECT content_hash FROM pages WHERE url = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, content_hash, fetched_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, content_hash, now, now),
+            )
+            if old and old[0] != content_hash:
+                self._drop_orphan(old[0])
+            if fields:
+                self._conn.execute("INSERT OR REPLACE INTO fields (url, data) VALUES (?, ?)", (key, json.dumps(fields)))
+            else:
+                self._conn.execute("DELETE FROM fields WHERE url = ?", (key,))
+            self._evict()
+            self._conn.commit()
+        return content_hash
+
+    def invalidate(self, url):
+        with self._lock:
+            self._delete(normalize_url(url))
+            self._conn.commit()
+
+    def _delete(self, key):
+        row = self._conn.execute("SELECT content_hash FROM pages WHERE url = ?", (key,)).fetchone()
+        self._conn.execute("DELETE FROM pages WHERE url = ?", (key,))
+        self._conn.execute("DELETE FROM fields WHERE url = ?", (key,))
+        if row:
+            self._drop_orphan(row[0])
+
+    def _drop_orphan(self, content_hash):
+        still_used = self._conn.execute(
+            "SELECT 1 FROM pages WHERE content_hash = ? LIMIT 1", (content_hash,)
+        ).fetchone()
+        if not still_used:
+            self._conn.execute("DELETE FROM contents WHERE content_hash = ?", (content_hash,))
+
+    def _evict(self):
+        # Expired entries go first, then least recently used ones until under budget
+        expired = self._conn.execute(
+            "SELECT url FROM pages WHERE fetched_at < ?", (time.time() - self.ttl,)
+        ).fetchall()
+        for (key,) in expired:
+            self._delete(key)
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM contents").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for (key,) in self._conn.execute("SELECT url FROM pages ORDER BY last_access").fetchall():
+            self._delete(key)
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM contents").fetchone()[0]
+            if total <= self.max_bytes:
+                break
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_scrape_cache():
+    """
+    Return the process-wide ScrapeCache, opening it on first use.
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ScrapeCache()
+        return _shared_cache
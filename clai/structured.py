@@ -0,0 +1,283 @@
+import json
+import re
+from html.parser import HTMLParser
+from urllib.parse import urlparse
+
+# Structured fields are used instead of asking Gemini only at or above this confidence
+MIN_CONFIDENCE = 0.8
+
+# Board markup holding the company and the position, as single CSS classes so the same
+# list works in HTMLParser and in document.querySelector (LinkedIn top card, Greenhouse)
+BOARD_SELECTORS = {
+    "company": ["topcard__org-name-link", "job-details-jobs-unified-top-card__company-name", "company-name"],
+    "position": ["top-card-layout__title", "topcard__title", "job-details-jobs-unified-top-card__job-title",
+                 "app-title"],
+}
+
+# Longer text than this under a selector means it matched a container, not a name
+MAX_SELECTOR_CHARS = 200
+
+# <meta> properties worth keeping
+META_KEYS = {"og:title", "og:site_name", "twitter:title"}
+
+# Page titles that spell out both fields on boards with a fixed title format
+TITLE_PATTERNS = [
+    # Greenhouse: "Job Application for Software Engineer at Acme"
+    ("greenhouse.io", re.compile(r"^Job Application for (?P<position>.+?) at (?P<company>.+)$")),
+    # Lever: "Acme - Software Engineer"
+    ("lever.co", re.compile(r"^(?P<company>.+?) - (?P<position>.+)$")),
+    # LinkedIn: "Acme hiring Software Engineer in Toronto, ON | LinkedIn"
+    ("linkedin.com", re.compile(r"^(?P<company>.+?) hiring (?P<position>.+?)(?: in .+?)? \| LinkedIn$")),
+]
+
+# Names of the sites hosting a posting, never the employer itself
+HOSTING_SITES = {"linkedin", "greenhouse", "lever", "workday", "ashby", "simplify", "indeed", "glassdoor"}
+
+# Legal and filler words dropped from company names, as the extraction prompt asks
+COMPANY_SUFFIXES = re.compile(
+    r"[,\s]+(inc\.?|llc|l\.l\.c\.|ltd\.?|limited|corp\.?|corporation|co\.|gmbh|plc|s\.a\.|markets)$",
+    re.IGNORECASE,
+)
+
+# Headings under which postings list their requirements
+REQUIREMENT_HEADINGS = re.compile(
+    r"^(requirements|qualifications|minimum qualifications|basic qualifications|preferred qualifications|"
+    r"what you bring|what we're looking for|what we are looking for|who you are|skills|"
+    r"you have|you might be a fit if|about you)\b",
+    re.IGNORECASE,
+)
+
+# Headings that end a requirements section
+SECTION_HEADINGS = re.compile(
+    r"^(about|benefits|perks|compensation|salary|pay|responsibilities|what you('ll| will) do|"
+    r"nice to have|bonus|preferred|why|how to apply|our|equal|location|the (role|team|opportunity))\b",
+    re.IGNORECASE,
+)
+
+# Requirement lines kept for the prompts
+MAX_REQUIREMENTS = 8
+
+
+class StructuredDataParser(HTMLParser):
+    """
+    Collects the machine-readable parts of a posting while the page streams in:
+    JSON-LD blocks, a few <meta> tags, the <title> and the text of the board markup in
+    BOARD_SELECTORS. `signals()` returns them in the same shape STRUCTURED_DATA_JS
+    produces in the browser.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.ld_json = []
+        self.meta = {}
+        self.title = ""
+        self.selectors = {}
+        self._capture = None  # [kind, key, tag, depth, parts] of the element being read
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if self._capture is not None:
+            if tag == self._capture[2]:
+                self._capture[3] += 1
+            return
+
+        if tag == "script" and (attrs.get("type") or "").lower() == "application/ld+json":
+            self._capture = ["ld_json", None, tag, 1, []]
+        elif tag == "title" and not self.title:
+            self._capture = ["title", None, tag, 1, []]
+        elif tag == "meta":
+            key = (attrs.get("property") or attrs.get("name") or "").lower()
+            if key in META_KEYS and attrs.get("content"):
+                self.meta.setdefault(key, attrs["content"].strip())
+        else:
+            classes = set((attrs.get("class") or "").split())
+            for key, names in BOARD_SELECTORS.items():
+                if key not in self.selectors and classes.intersection(names):
+                    self._capture = ["selector", key, tag, 1, []]
+                    break
+
+    def handle_endtag(self, tag):
+        if self._capture is None or tag != self._capture[2]:
+            return
+        self._capture[3] -= 1
+        if self._capture[3]:
+            return
+
+        kind, key, _, _, parts = self._capture
+        self._capture = None
+        text = "".join(parts)
+        if kind == "ld_json":
+            self.ld_json.append(text)
+        else:
+            text = " ".join(text.split())
+            if kind == "title":
+                self.title = text
+            elif text:
+                self.selectors[key] = text
+
+    def handle_data(self, data):
+        if self._capture is None:
+            return
+        parts = self._capture[4]
+        parts.append(data)
+        if self._capture[0] == "selector" and sum(len(part) for part in parts) > MAX_SELECTOR_CHARS:
+            self._capture = None  # A whole section, or an element that is never closed
+
+    def signals(self):
+        return {"ld_json": self.ld_json, "meta": self.meta, "title": self.title, "selectors": self.selectors}
+
+
+# Browser-side twin of StructuredDataParser; defines `structured` for the scripts that embed it
+STRUCTURED_DATA_JS = """
+const structured = (() => {
+    const selectors = {};
+    for (const [key, names] of Object.entries(%s)) {
+        for (const name of names) {
+            const el = document.querySelector("." + name);
+            const text = el && el.innerText.trim();
+            if (text) { selectors[key] = text.split(/\\s+/).join(" "); break; }
+        }
+    }
+    const meta = {};
+    for (const m of document.querySelectorAll("meta[property], meta[name]")) {
+        const key = (m.getAttribute("property") || m.getAttribute("name")).toLowerCase();
+        if (%s.includes(key) && m.content && !(key in meta)) meta[key] = m.content.trim();
+    }
+    const ld_json = Array.from(document.querySelectorAll('script[type="application/ld+json"]'), s => s.textContent);
+    return {ld_json: ld_json, meta: meta, title: document.title.trim(), selectors: selectors};
+})();
+""" % (json.dumps(BOARD_SELECTORS), json.dumps(sorted(META_KEYS)))
+
+
+def _strip_html(text):
+    # JSON-LD descriptions and qualifications are often HTML, sometimes entity-escaped
+    text = re.sub(r"&lt;.*?&gt;|<[^>]+>", "\n", text)
+    return " ".join(text.replace("&amp;", "&").split())
+
+
+def _job_postings(blocks):
+    """
+    Every JSON-LD object of type JobPosting in the page, including ones nested in @graph.
+    """
+    for block in blocks:
+        try:
+            data = json.loads(block)
+        except ValueError:
+            continue
+        stack = [data]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, list):
+                stack.extend(item)
+            elif isinstance(item, dict):
+                types = item.get("@type")
+                if types == "JobPosting" or (isinstance(types, list) and "JobPosting" in types):
+                    yield item
+                stack.extend(item.get("@graph") or [])
+
+
+def clean_company_name(name):
+    """
+    Drop legal suffixes like 'Inc.' or 'Ltd.' the way the extraction prompt asks Gemini to.
+    """
+    name = " ".join((name or "").split()).strip(" ,")
+    name = re.sub(r"^at\s+", "", name)  # Greenhouse prints "at Acme" under the title
+    while True:
+        stripped = COMPANY_SUFFIXES.sub("", name).strip(" ,")
+        if stripped == name:
+            return name
+        name = stripped
+
+
+def simplify_position_name(title):
+    """
+    Reduce a posting title to the general role the prompts ask for: no parentheses,
+    team or location after a separator, years or seasons, and 'co-op' becomes 'intern'.
+    """
+    title = re.sub(r"\([^)]*\)|\[[^\]]*\]", " ", title or "")
+    title = re.split(r"\s+[-–—|/]\s+|,", title)[0]
+    title = re.sub(r"\b(19|20)\d\d\b|\b(summer|fall|autumn|winter|spring)\b", " ", title, flags=re.IGNORECASE)
+    title = re.sub(r"\bco-?op\b", "Intern", title, flags=re.IGNORECASE)
+    title = " ".join(title.split())
+    return re.sub(r"\bIntern(?: Intern)+\b", "Intern", title)
+
+
+def requirements_from_text(text):
+    """
+    The lines listed under the first requirements-like heading of the description,
+    joined with '; ', or "" if there is no such section.
+    """
+    lines = [line.strip(" •*-\t") for line in (text or "").splitlines()]
+    for i, line in enumerate(lines):
+        if len(line) < 60 and REQUIREMENT_HEADINGS.match(line):
+            items = []
+            for item in lines[i + 1:]:
+                if not item:
+                    continue
+                if len(item) < 60 and (SECTION_HEADINGS.match(item) or item.endswith(":")):
+                    break  # Next section
+                items.append(item)
+                if len(items) == MAX_REQUIREMENTS:
+                    break
+            if items:
+                return "; ".join(items)
+    return ""
+
+
+def _candidates(signals, host):
+    """
+    (confidence, source, company, position, requirements) for every place the page
+    states both fields, most trustworthy first.
+    """
+    for posting in _job_postings(signals.get("ld_json") or []):
+        organization = posting.get("hiringOrganization")
+        company = organization.get("name") if isinstance(organization, dict) else organization
+        requirements = posting.get("skills") or posting.get("qualifications") or ""
+        if isinstance(requirements, list):
+            requirements = "; ".join(str(r) for r in requirements)
+        yield 0.95, "json-ld", company, posting.get("title"), _strip_html(str(requirements))
+
+    selectors = signals.get("selectors") or {}
+    if selectors.get("company") and selectors.get("position"):
+        yield 0.9, "page markup", selectors["company"], selectors["position"], ""
+
+    meta = signals.get("meta") or {}
+    for domain, pattern in TITLE_PATTERNS:
+        if host == domain or host.endswith("." + domain):
+            for title in (meta.get("og:title"), meta.get("twitter:title"), signals.get("title")):
+                match = pattern.match(title or "")
+                if match:
+                    yield 0.85, "page title", match.group("company"), match.group("position"), ""
+                    break
+
+    if meta.get("og:site_name") and meta.get("og:title"):
+        yield 0.6, "og tags", meta["og:site_name"], meta["og:title"], ""
+
+
+def posting_fields(signals, url, text=""):
+    """
+    Company name, position name and requirements read deterministically from the page's
+    structured data, or None when no source is trustworthy enough (see MIN_CONFIDENCE)
+    and Gemini should extract them instead.
+    """
+    if not signals:
+        return None
+    host = urlparse(url).netloc.lower()
+    for confidence, source, company, position, requirements in _candidates(signals, host):
+        company = clean_company_name(company if isinstance(company, str) else "")
+        position = simplify_position_name(position if isinstance(position, str) else "")
+        if not company or not position or company.lower() in HOSTING_SITES:
+            continue
+        # Long or oddly shaped titles are where Gemini's rewording still earns its keep
+        if len(position.split()) > 6 or re.search(r"\d", position):
+            confidence -= 0.2
+        if confidence < MIN_CONFIDENCE:
+            continue
+        return {
+            "company_name": company,
+            "position_name": position,
+            "requirements": requirements or requirements_from_text(text),
+            "source": source,
+            "confidence": round(confidence, 2),
+        }
+    return None
@@ -0,0 +1,49 @@
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+# Query parameters that only track where a click came from on any site: ad click IDs
+# and the job boards' own tracking names, which no other site uses for content
+TRACKING_PARAMS = {
+    "gclid", "fbclid", "msclkid", "mc_cid", "mc_eid", "igshid", "gh_src",
+}
+TRACKING_PREFIXES = ("utm_", "trk", "lever-")
+
+# Generic names that are tracking only on the boards that use them that way; elsewhere
+# they can select a different posting, so they are kept. Matched against the end of
+# the host name.
+HOST_TRACKING_PARAMS = {
+    "linkedin.com": {"refid", "trackingid", "lipi", "originalsubdomain", "position", "pagenum", "ebp",
+                     "ref", "src"},
+    "greenhouse.io": {"source", "src", "ref"},
+    "lever.co": {"source", "src", "ref"},
+    "ashbyhq.com": {"source", "src", "ref"},
+    "myworkdayjobs.com": {"source", "src", "ref"},
+}
+
+
+def _host_params(host):
+    for domain, params in HOST_TRACKING_PARAMS.items():
+        if host == domain or host.endswith("." + domain):
+            return params
+    return ()
+
+
+def _is_tracking(key, host_params=()):
+    key = key.lower()
+    return key.startswith(TRACKING_PREFIXES) or key in TRACKING_PARAMS or key in host_params
+
+
+def normalize_url(url):
+    """
+    Canonical form of a job posting URL, used as a cache and de-duplication key:
+    lowercase scheme and host without "www.", no fragment, no trailing slash,
+    tracking parameters removed and the remaining ones sorted.
+    """
+    parsed = urlparse(url.strip())
+    host = parsed.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parsed.path.rstrip("/") or "/"
+    host_params = _host_params(host)
+    query = sorted((k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+                   if not _is_tracking(k, host_params))
+    return urlunparse((parsed.scheme.lower(), host, path, "", urlencode(query), ""))
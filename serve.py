@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote
+
+from clai.condense import condense
+from clai.converter import get_converter
+from clai.driver_pool import get_driver_pool
+from clai.engine import GENERATION_MODES, STAGE_WORKERS, LetterPipeline, is_valid_url
+from clai.gemini import configure_gemini
+from clai.metrics import metrics, print_latency_report, write_report
+from clai.renderer import get_renderer
+
+api_keys = [""]  # Add as many keys as you have; requests are spread across all of them
+
+GEMINI_MODEL = "gemini-1.5-flash"
+
+# Largest request body accepted; pasted job descriptions are far smaller
+MAX_BODY_BYTES = 1024 * 1024
+
+# What POST /letters can send back: JSON with the PDF path, or the document itself
+RESPONSE_FORMATS = {
+    "json": "application/json",
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+
+def content_disposition(filename):
+    """
+    Content-Disposition header value for a download named `filename`. Headers are sent as
+    latin-1, so the real name goes in RFC 5987 `filename*` and an ASCII `filename` is
+    given for older clients.
+    """
+    stem, extension = os.path.splitext(filename)
+    stem = unicodedata.normalize("NFKD", stem).encode("ascii", "ignore").decode("ascii")
+    stem = " ".join(re.sub(r'["\\\x00-\x1f]', "", stem).split()) or "letter"
+    return f"attachment; filename=\"{stem}{extension}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+
+class LetterServer:
+    """
+    Local HTTP front-end over a LetterPipeline that stays warm between requests: the
+    browsers, the compiled template, the Gemini clients and LibreOffice are started once
+    and every request only pays for its own letter.
+
+    POST /letters takes a JSON body with either "url" or "job_description" (plus
+    optional "company_name" and "position_name") and a "format" of json (default), pdf
+    or docx. GET /health reports that the server is up and GET /report returns the
+    latency report for the letters served so far.
+    """
+
+    def __init__(self, pipeline, host="127.0.0.1", port=8750, timeout=300):
+        self.pipeline = pipeline
+        self.timeout = timeout
+        self.started = time.time()
+        self.served = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+
+    @property
+    def address(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def create_letter(self, request):
+        """
+        Run one POST /letters body through the pipeline. Returns (status, LetterResult
+        or an error message).
+        """
+        url = request.get("url")
+        known = {}
+        if request.get("job_description"):
+            known.update(job_description=condense(request["job_description"]), posting_fields=None)
+        elif not url or not is_valid_url(url):
+            return 400, "Send a valid 'url' or a 'job_description'"
+        if request.get("company_name") and request.get("position_name"):
+            known.update(company_name=request["company_name"].strip(), position_name=request["position_name"].strip(),
+                         requirements=request.get("requirements") or "")
+
+        result = self.pipeline.submit(url, **known).result(timeout=self.timeout)
+        with self._lock:
+            self.served += 1
+        return (200 if result.ok else 422), result
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send(self, status, body, content_type="application/json", filename=None):
+                if content_type == "application/json":
+                    body = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                if filename:
+                    self.send_header("Content-Disposition", content_disposition(filename))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path == "/health":
+                    self._send(200, {"status": "ok", "uptime_seconds": round(time.time() - server.started, 1),
+                                     "served": server.served})
+                elif self.path == "/report":
+                    self._send(200, metrics.report(served=server.served))
+                else:
+                    self._send(404, {"error": f"Unknown path {self.path}"})
+
+            def do_POST(self):
+                if self.path != "/letters":
+                    self._send(404, {"error": f"Unknown path {self.path}"})
+                    return
+                # Browsers send cross-origin form and text/plain posts without asking first;
+                # requiring JSON keeps other web pages from triggering letters
+                content_type = (self.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+                if content_type != "application/json":
+                    self._send(415, {"error": "Send the request as application/json"})
+                    return
+                try:
+                    length = int(self.headers.get("Content-Length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    self._send(400, {"error": "Invalid Content-Length"})
+                    return
+                if length > MAX_BODY_BYTES:
+                    self._send(413, {"error": "Request body too large"})
+                    return
+                try:
+                    request = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError as e:
+                    self._send(400, {"error": f"Invalid JSON: {e}"})
+                    return
+                if not isinstance(request, dict):
+                    self._send(400, {"error": "Send a JSON object"})
+                    return
+                response_format = request.get("format", "json")
+                if response_format not in RESPONSE_FORMATS:
+                    self._send(400, {"error": f"'format' must be one of {', '.join(RESPONSE_FORMATS)}"})
+                    return
+
+                start = time.perf_counter()
+                try:
+                    status, result = server.create_letter(request)
+                except Exception as e:
+                    self._send(500, {"error": f"{type(e).__name__}: {e}"})
+                    return
+                if status == 400:
+                    self._send(status, {"error": result})
+                    return
+
+                body = {
+                    "ok": result.ok,
+                    "company_name": result.company_name,
+                    "position_name": result.position_name,
+                    "pdf_path": result.pdf_path,
+                    "document_text": result.document_text,
+                    "seconds": round(time.perf_counter() - start, 3),
+                }
+                if not result.ok:
+                    body.update(failed_stage=result.failed_stage, error=str(result.error))
+                    self._send(status, body)
+                elif response_format == "pdf":
+                    with open(result.pdf_path, "rb") as f:
+                        self._send(200, f.read(), RESPONSE_FORMATS["pdf"], os.path.basename(result.pdf_path))
+                elif response_format == "docx":
+                    filename = os.path.splitext(os.path.basename(result.pdf_path))[0] + ".docx"
+                    self._send(200, result.docx_bytes, RESPONSE_FORMATS["docx"], filename)
+                else:
+                    self._send(200, body)
+
+            def log_message(self, format, *args):
+                print(f"{self.address_string()} - {format % args}")
+
+        return Handler
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serve cover letters over a local HTTP API, keeping "
+                                                 "Chrome, Gemini and LibreOffice warm between requests")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="Interface to listen on (default: 127.0.0.1, local requests only)")
+    parser.add_argument("--port", type=int, default=8750,
+                        help="Port to listen on (default: 8750)")
+    parser.add_argument("--mode", choices=GENERATION_MODES, default="single",
+                        help="Generation mode, as in multigen.py (default: single)")
+    parser.add_argument("--template", default=None,
+                        help="Word template (default: Template.docx next to this script)")
+    parser.add_argument("--output-dir", default=None,
+                        help="Where PDFs are written (default: the directory of this script)")
+    parser.add_argument("--browsers", type=int, default=2,
+                        help="Warm Chrome instances, one per scrape worker (default: 2)")
+    parser.add_argument("--converters", type=int, default=1,
+                        help="Resident LibreOffice instances used for PDF conversion (default: 1)")
+    parser.add_argument("--max-inflight", type=int, default=8,
+                        help="Gemini requests kept in flight per API key (default: 8)")
+    parser.add_argument("--pages-per-browser", type=int, default=25,
+                        help="Recycle a pooled Chrome after this many pages (default: 25)")
+    parser.add_argument("--timeout", type=int, default=300,
+                        help="Seconds a request may wait for its letter (default: 300)")
+    parser.add_argument("--report", default=None,
+                        help="Where to write the JSON latency report on shutdown (default: serve_report.json "
+                             "next to this script)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    script_dir = os.path.dirname(os.path.realpath(__file__))
+    template_path = args.template or os.path.join(script_dir, "Template.docx")
+    output_dir = args.output_dir or script_dir
+
+    # Pay every startup cost once, before the first request arrives
+    print("Warming up...")
+    configure_gemini(api_keys, GEMINI_MODEL, max_concurrency=args.max_inflight)
+    get_renderer(template_path)
+    get_converter(instances=args.converters)
+    get_driver_pool(size=args.browsers, max_pages=args.pages_per_browser).warm()
+
+    workers = dict(STAGE_WORKERS, scrape=args.browsers)
+    pipeline = LetterPipeline(template_path, output_dir, args.mode, workers=workers, copy_to_clipboard=False,
+                              keep_docx=True).start()
+    server = LetterServer(pipeline, args.host, args.port, args.timeout)
+    print(f"Serving cover letters on {server.address} (Ctrl+C to stop)")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+    finally:
+        server.close()
+        pipeline.close()
+        report = metrics.report(mode=args.mode, served=server.served)
+        print_latency_report(report)
+        report_path = args.report or os.path.join(script_dir, "serve_report.json")
+        write_report(report_path, report)
+        print(f"Latency report written to {report_path}")
+
+
+if __name__ == "__main__":
+    main()
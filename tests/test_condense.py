@@ -0,0 +1,32 @@
+from clai.condense import condense, estimate_tokens
+
+
+def test_single_long_paragraph_is_cut_not_dropped():
+    sentence = "You will build Python services and distributed data pipelines for our customers. "
+    text = (sentence * 80).strip()  # One 6000+ character line
+    condensed = condense(text, token_budget=300)
+    assert condensed
+    assert text.startswith(condensed)
+    assert condensed.endswith(".")
+    assert estimate_tokens(condensed) <= 300
+
+
+def test_long_paragraph_under_header_is_kept():
+    body = "We are looking for engineers who enjoy working on Go and Kubernetes in production. " * 80
+    text = "Backend Software Engineer\nNorthwind Robotics\n" + body
+    condensed = condense(text, token_budget=300)
+    lines = condensed.splitlines()
+    assert lines[:2] == ["Backend Software Engineer", "Northwind Robotics"]
+    assert len(lines) == 3 and lines[2].startswith("We are looking for engineers")
+
+
+def test_headings_count_against_the_budget():
+    sections = []
+    for n in range(12):
+        sections.append(f"Requirements for area {n}:")
+        sections += [f"Experience with Python, SQL and AWS in production system number {n}-{k}." for k in range(4)]
+    text = "\n".join(sections)
+    for budget in (40, 75, 150, 333):
+        condensed = condense(text, token_budget=budget)
+        assert estimate_tokens(condensed) <= budget
+        assert not condensed.splitlines()[-1].endswith(":")
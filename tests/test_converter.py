@@ -0,0 +1,43 @@
+import os
+import stat
+
+import pytest
+
+from clai.converter import PdfConverter
+
+# Stands in for soffice: "converts" every input except those named broken*.docx
+FAKE_SOFFICE = """#!/bin/sh
+out=""
+while [ $# -gt 0 ]; do
+    case "$1" in
+        --outdir) out="$2"; shift 2;;
+        --*|-env*) shift;;
+        *) name=$(basename "$1" .docx); case "$name" in broken*) ;; *) cp "$1" "$out/$name.pdf";; esac; shift;;
+    esac
+done
+"""
+
+
+@pytest.fixture
+def converter(tmp_path):
+    binary = tmp_path / "soffice"
+    binary.write_text(FAKE_SOFFICE)
+    binary.chmod(binary.stat().st_mode | stat.S_IEXEC)
+    converter = PdfConverter(binary=str(binary), use_unoserver=False)
+    yield converter
+    converter.close()
+
+
+def test_batch_conversion_writes_the_pdf(converter, tmp_path):
+    pdf_path = converter.convert_bytes(b"new letter", "Acme Engineer", str(tmp_path))
+    assert pdf_path == os.path.join(str(tmp_path), "Acme Engineer.pdf")
+    with open(pdf_path, "rb") as f:
+        assert f.read() == b"new letter"
+
+
+def test_pdf_left_from_an_earlier_run_is_not_success(converter, tmp_path):
+    stale = tmp_path / "broken letter.pdf"
+    stale.write_bytes(b"old letter")
+    with pytest.raises(RuntimeError, match="did not produce"):
+        converter.convert_bytes(b"new letter", "broken letter", str(tmp_path))
+    assert stale.read_bytes() == b"old letter"
@@ -0,0 +1,29 @@
+from clai.journal import BatchJournal
+
+
+def test_torn_last_line_is_cut_before_appending(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = BatchJournal(str(path))
+    journal.record_stage("https://example.com/jobs/1", "scrape", {"job_description": "Build things"})
+    journal.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"event": "stage", "key"')  # Crash mid-write
+
+    journal = BatchJournal(str(path))
+    journal.record_failed("https://example.com/jobs/2", "extract", "boom")
+    journal.close()
+
+    journal = BatchJournal(str(path))
+    assert journal.resume("https://example.com/jobs/1")["job_description"] == "Build things"
+    assert journal.status("https://example.com/jobs/2") == "failed"
+    journal.close()
+    assert all(line.startswith('{"event"') for line in path.read_text(encoding="utf-8").splitlines())
+
+
+def test_finished_urls_keep_only_their_status(tmp_path):
+    journal = BatchJournal(str(tmp_path / "journal.jsonl"))
+    journal.record_stage("https://example.com/jobs/1", "scrape", {"job_description": "Build things"})
+    journal.record_done("https://example.com/jobs/1", "/out/letter.pdf")
+    assert journal.status("https://example.com/jobs/1") == "done"
+    assert journal.resume("https://example.com/jobs/1") == {"url": "https://example.com/jobs/1"}
+    journal.close()
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from clai.json_stream import SchemaViolation, StreamingJSONParser, parse_json
+from clai.prompts import EXPECTED_PREFIXES, GLAZING_SCHEMA, LETTER_SCHEMA
+
+GLAZING = "I am drawn by Acme's work on C++ [C++] and [Go] services."
+
+
+def feed_in_chunks(parser, text, size):
+    for i in range(0, len(text), size):
+        if parser.feed(text[i:i + size]):
+            return True
+    return False
+
+
+def test_valid_response_split_across_chunks():
+    text = '```json\n' + json.dumps({"glazing": GLAZING}) + '\n```'
+    for size in (1, 3, 7, len(text)):
+        parser = StreamingJSONParser(GLAZING_SCHEMA, EXPECTED_PREFIXES)
+        assert feed_in_chunks(parser, text, size)
+        assert parser.result() == {"glazing": GLAZING}
+
+
+def test_escaped_quotes_and_unicode_escapes():
+    text = r'{"glazing": "I am drawn by the \"Caf\u00e9\" team \\ and its \u2013 mission."}'
+    assert parse_json(text, GLAZING_SCHEMA, EXPECTED_PREFIXES) == \
+        {"glazing": 'I am drawn by the "Café" team \\ and its – mission.'}
+
+
+def test_wrong_opening_prefix_aborts_early():
+    parser = StreamingJSONParser(GLAZING_SCHEMA, EXPECTED_PREFIXES)
+    with pytest.raises(SchemaViolation, match="should start with"):
+        feed_in_chunks(parser, '{"glazing": "As a passionate engineer, ' + "x" * 1000 + '"}', 1)
+    assert parser.length < 30
+
+
+def test_missing_required_key():
+    with pytest.raises(SchemaViolation, match="missing"):
+        parse_json('{"company_name": "Acme", "position_name": "Engineer"}', LETTER_SCHEMA)
+
+
+def test_trailing_text_after_the_closing_brace_is_ignored():
+    parser = StreamingJSONParser(GLAZING_SCHEMA, EXPECTED_PREFIXES)
+    assert parser.feed('{"glazing": "I am drawn by Acme."}\nHope this helps! {"glazing": ')
+    assert parser.result() == {"glazing": "I am drawn by Acme."}
+
+
+def test_template_placeholders_are_rejected():
+    with pytest.raises(SchemaViolation, match=r"\[Programming Language\]"):
+        parse_json('{"glazing": "I am drawn by your use of [Programming Language] daily."}', GLAZING_SCHEMA,
+                   EXPECTED_PREFIXES)
+    with pytest.raises(SchemaViolation, match=r"\[Skills\]"):
+        StreamingJSONParser(GLAZING_SCHEMA).feed('{"glazing": "I am drawn by [Skills]')
@@ -0,0 +1,67 @@
+import asyncio
+
+from clai import key_pool
+from clai.key_pool import COOLDOWN_SECONDS, MAX_COOLDOWN_SECONDS, KeyPool
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_pool(monkeypatch, keys=3):
+    clock = Clock()
+    monkeypatch.setattr(key_pool.time, "monotonic", clock)
+    return KeyPool([object() for _ in range(keys)]), clock
+
+
+def test_requests_go_to_the_least_loaded_key(monkeypatch):
+    pool, clock = make_pool(monkeypatch)
+    first, second, third = (asyncio.run(pool.acquire()) for _ in range(3))
+    assert [first.index, second.index, third.index] == [0, 1, 2]
+
+    # Fewest in flight wins even though key 0 has already served a request this minute
+    pool.release(first, tokens=100)
+    assert asyncio.run(pool.acquire()).index == 0
+
+
+def test_ties_in_flight_go_to_the_key_used_least_this_minute(monkeypatch):
+    pool, clock = make_pool(monkeypatch, keys=2)
+    pool.release(asyncio.run(pool.acquire()), tokens=100)
+    assert asyncio.run(pool.acquire()).index == 1
+
+    # Key 0's request drops out of the usage window; key 1's is recent
+    clock.now += key_pool.USAGE_WINDOW_SECONDS + 1
+    pool.release(pool.keys[1], tokens=100)
+    assert asyncio.run(pool.acquire()).index == 0
+
+def test_cooldown_doubles_per_consecutive_error_and_resets_on_success(monkeypatch):
+    pool, clock = make_pool(monkeypatch, keys=2)
+    key = pool.keys[0]
+    for errors in range(1, 7):
+        key.in_flight += 1
+        pool.release(key, exhausted=True)
+        expected = min(MAX_COOLDOWN_SECONDS, COOLDOWN_SECONDS * 2 ** (errors - 1))
+        assert key.cooldown_until - clock.now == expected
+    assert asyncio.run(pool.acquire()).index == 1  # Key 0 is benched
+
+    clock.now = key.cooldown_until
+    key.in_flight += 1
+    pool.release(key, tokens=10)
+    key.in_flight += 1
+    pool.release(key, exhausted=True)
+    assert key.cooldown_until - clock.now == COOLDOWN_SECONDS
+    assert key.quota_errors == 7
+
+
+def test_pick_reports_the_wait_when_every_key_is_cooling_down(monkeypatch):
+    pool, clock = make_pool(monkeypatch, keys=2)
+    for key, errors in zip(pool.keys, (1, 2)):
+        for _ in range(errors):
+            key.in_flight += 1
+            pool.release(key, exhausted=True)
+    key, wait = pool._pick()
+    assert key is None and wait == COOLDOWN_SECONDS
@@ -0,0 +1,22 @@
+from clai.overlap import DEFAULT_THRESHOLD, containment
+
+RESPONSE_TOP = ("I am eager to leverage my experience building Python services and distributed systems to help "
+                "Stripe deliver reliable payment infrastructure at scale.")
+
+
+def test_paraphrased_pair_overlaps():
+    glazing = ("I am drawn by Stripe's commitment to building reliable infrastructure for the internet economy. "
+               "My work with Python and distributed systems has shown me how much dependable platforms matter, "
+               "and I want to help deliver that reliability.")
+    assert containment(RESPONSE_TOP, glazing, ignore=("Stripe",)) >= DEFAULT_THRESHOLD
+
+
+def test_separately_written_pair_does_not_overlap():
+    glazing = ("I am drawn by Stripe's mission to increase the GDP of the internet and make economic opportunity "
+               "accessible to small businesses everywhere. I value work that lowers barriers for others, and I "
+               "want to grow in a culture that rewards curiosity and rigor.")
+    assert containment(RESPONSE_TOP, glazing, ignore=("Stripe",)) < DEFAULT_THRESHOLD
+
+
+def test_company_name_and_required_openings_are_ignored():
+    assert containment("I am eager to leverage Stripe's", "I am drawn by Stripe", ignore=("Stripe",)) == 0.0
@@ -0,0 +1,69 @@
+import threading
+
+from clai.prefetch import Prefetcher
+
+
+class FakeFetcher:
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def fetch(self, url):
+        with self.lock:
+            self.calls.append(url)
+        if url in self.fail:
+            raise RuntimeError("page did not load")
+        return f"Description of {url}", None
+
+
+def test_prefetched_url_is_handed_over_without_fetching_again():
+    fetcher = FakeFetcher()
+    extracted = []
+    prefetcher = Prefetcher(fetcher, extract=extracted.append)
+    assert prefetcher.prefetch("https://example.com/jobs/1?utm_source=feed")
+    prefetcher._pending["https://example.com/jobs/1"].result()
+
+    description = "Description of https://example.com/jobs/1?utm_source=feed"
+    assert prefetcher.fetch("https://example.com/jobs/1") == (description, None)
+    assert fetcher.calls == ["https://example.com/jobs/1?utm_source=feed"]
+    assert extracted == [description]
+    assert prefetcher.stats()["hits"] == 1
+    prefetcher.close()
+
+
+def test_url_never_prefetched_is_fetched_normally():
+    fetcher = FakeFetcher()
+    prefetcher = Prefetcher(fetcher)
+    assert prefetcher.fetch("https://example.com/jobs/2") == ("Description of https://example.com/jobs/2", None)
+    assert prefetcher.stats()["misses"] == 1
+    prefetcher.close()
+
+
+def test_failed_prefetch_is_handed_over_as_the_failure():
+    fetcher = FakeFetcher(fail={"https://example.com/jobs/3"})
+    prefetcher = Prefetcher(fetcher)
+    prefetcher.prefetch("https://example.com/jobs/3")
+    prefetcher._pending["https://example.com/jobs/3"].exception()
+
+    assert prefetcher.fetch("https://example.com/jobs/3") == (None, None)
+    assert fetcher.calls == ["https://example.com/jobs/3"]
+    stats = prefetcher.stats()
+    assert (stats["failed"], stats["hits"], stats["misses"]) == (1, 0, 0)
+    prefetcher.close()
+
+
+def test_pending_limit_skips_further_prefetches():
+    release = threading.Event()
+
+    class SlowFetcher(FakeFetcher):
+        def fetch(self, url):
+            release.wait(5)
+            return super().fetch(url)
+
+    prefetcher = Prefetcher(SlowFetcher(), max_pending=1)
+    assert prefetcher.prefetch("https://example.com/jobs/4")
+    assert not prefetcher.prefetch("https://example.com/jobs/5")
+    assert prefetcher.stats()["skipped"] == 1
+    release.set()
+    prefetcher.close()
@@ -0,0 +1,40 @@
+from clai import readiness
+from clai.readiness import DEFAULT_STRATEGY, AllOf, NetworkIdle, Strategy, strategy_for
+
+
+class FakeDriver:
+    def __init__(self, counts):
+        self.counts = iter(counts)
+
+    def execute_script(self, expression):
+        return next(self.counts)
+
+
+class Timed(Strategy):
+    def __init__(self, ready, timeout):
+        super().__init__(timeout)
+        self.ready = ready
+        self.given = None
+
+    def wait(self, driver, timeout=None):
+        self.given = timeout
+        return self.ready
+
+
+def test_network_idle_waits_for_requests_to_stop(monkeypatch):
+    monkeypatch.setattr(readiness, "POLL_SECONDS", 0)
+    driver = FakeDriver([1, 3, 7] + [7] * 100000)
+    assert NetworkIdle(quiet=0.05, timeout=2).wait(driver)
+
+
+def test_network_idle_is_assigned_to_single_page_apps():
+    strategy = strategy_for("https://apply.workable.com/acme/j/ABC123/")
+    assert "network_idle" in strategy.name
+    assert strategy_for("https://example.com/careers/1") is DEFAULT_STRATEGY
+
+
+def test_all_of_stops_at_the_first_timeout_within_one_deadline():
+    first, second, third = Timed(True, 5), Timed(False, 5), Timed(True, 5)
+    assert not AllOf(first, second, third, timeout=3).wait(None)
+    assert 0 < second.given <= first.given <= 3
+    assert third.given is None
@@ -0,0 +1,13 @@
+from serve import content_disposition
+
+
+def test_download_names_survive_latin1_headers():
+    header = content_disposition("Škoda Engineer – Intern.pdf")
+    header.encode("latin-1")
+    assert 'filename="Skoda Engineer Intern.pdf"' in header
+    assert "filename*=UTF-8''%C5%A0koda%20Engineer%20%E2%80%93%20Intern.pdf" in header
+
+
+def test_ascii_fallback_never_breaks_the_quoted_name():
+    assert 'filename="letter.docx"' in content_disposition("株式会社.docx")
+    assert 'filename="Acme Dev.pdf"' in content_disposition('Acme "Dev".pdf')
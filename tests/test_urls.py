@@ -0,0 +1,18 @@
+from clai.ingest import posting_key
+from clai.urls import normalize_url
+
+
+def test_workday_keys_include_the_tenant():
+    acme = posting_key("https://acme.wd1.myworkdayjobs.com/en-US/Careers/job/Remote/Engineer_R-12345")
+    globex = posting_key("https://globex.wd5.myworkdayjobs.com/Jobs/job/New-York/Developer_R-12345")
+    assert acme == "workday:acme/R-12345"
+    assert acme != globex
+
+
+def test_generic_parameters_are_kept_outside_the_boards_that_track_with_them():
+    assert normalize_url("https://example.com/jobs?position=42&source=feed&utm_source=x") == \
+        "https://example.com/jobs?position=42&source=feed"
+    assert normalize_url("https://www.linkedin.com/jobs/view/123?position=1&pageNum=0&trk=abc") == \
+        "https://linkedin.com/jobs/view/123"
+    assert normalize_url("https://boards.greenhouse.io/acme/jobs/55?gh_src=x&source=LinkedIn") == \
+        "https://boards.greenhouse.io/acme/jobs/55"